@@ -0,0 +1,155 @@
+# Evaluation of many boards at once with NumPy, for scoring big sets of positions
+# (and all the children of a node in one call inside the search). It gives exactly the
+# values of engine.evaluateBoard (the pattern evaluation when the engine has pattern
+# weights, h otherwise), computed with array operations over all the boards instead of one
+# Python loop per space. NumPy is only needed by this module:
+#   pip install numpy
+
+import numpy as np
+
+import engine
+
+FULL = np.uint64(engine.FULL_MASK)
+# Shifts and masks of the 4 directions of engine.BB_LEFT_SHIFTS and BB_RIGHT_SHIFTS (both
+# use the same shifts) as (4, 1) columns, so the 4 directions of all the boards are flooded
+# at the same time.
+SHIFTS = np.array([[shift] for shift, _ in engine.BB_LEFT_SHIFTS], dtype=np.uint64)
+LEFT_MASKS = np.array([[mask] for _, mask in engine.BB_LEFT_SHIFTS], dtype=np.uint64)
+RIGHT_MASKS = np.array([[mask] for _, mask in engine.BB_RIGHT_SHIFTS], dtype=np.uint64)
+
+# Value of each space for each state, indexed by x * 8 + y like the bits of the bitboards.
+# As in engine.squareValue they already include the surroundedBy points the piece (or the
+# empty space) gives to its neighbours, so the neighbour term is a weighted sum of the spaces.
+OWN_WEIGHTS = np.array(engine.OWN_SQUARE_VALUE, dtype=np.int32)
+OPPONENT_WEIGHTS = np.array(engine.OPPONENT_SQUARE_VALUE, dtype=np.int32)
+EMPTY_WEIGHTS = np.array(engine.EMPTY_SQUARE_VALUE, dtype=np.int32)
+# C and X spaces, the corner next to each one and what a computer piece on them adds when it
+# doesn't have that corner (the penalty) and when it does (+20), as in engine.cornerAroundBy.
+CX_SQUARES = np.array([i for i in range(64) if engine.CX_PENALTY[i]])
+CX_CORNERS = np.array([x * 8 + y for i in CX_SQUARES for (x, y) in engine.ADJACENT_CORNERS[i]])
+CX_PENALTIES = np.array([engine.CX_PENALTY[i] for i in CX_SQUARES], dtype=np.int32)
+# Mobility terms of h for every number of moves.
+OPPONENT_MOVES_VALUE = np.array([engine.valueOfOpponentMoves(n) for n in range(65)], dtype=np.int32)
+POSSIBLE_MOVES_VALUE = np.array([engine.valueOfPossibleMoves(n) for n in range(65)], dtype=np.int32)
+BYTE_BITS = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+# Spaces and powers of 3 of each instance of engine.PATTERN_INSTANCES, padded to the longest
+# one with space 64, which is always empty, and the offset of the table of its pattern.
+PATTERN_LENGTH = max(len(squares) for _, squares in engine.PATTERN_INSTANCES)
+INSTANCE_SQUARES = np.array([squares + [64] * (PATTERN_LENGTH - len(squares))
+                             for _, squares in engine.PATTERN_INSTANCES])
+INSTANCE_POWERS = np.array([[3 ** i for i in range(len(squares))] + [0] * (PATTERN_LENGTH - len(squares))
+                            for _, squares in engine.PATTERN_INSTANCES], dtype=np.int32)
+INSTANCE_OFFSETS = np.array([engine.PATTERN_OFFSETS[pattern] for pattern, _ in engine.PATTERN_INSTANCES], dtype=np.int32)
+
+
+def popcount(bits):
+    # Number of bits set of each uint64 of <bits>.
+    if hasattr(np, 'bitwise_count'):  # NumPy 2.0 and later
+        return np.bitwise_count(bits).astype(np.int32)
+    return BYTE_BITS[bits.view(np.uint8)].reshape(bits.shape + (8,)).sum(axis=-1, dtype=np.int32)
+
+
+def validMoves(own, opp):
+    # engine.bbValidMoves for arrays of bitboards.
+    empty = ~(own | opp) & FULL
+    moves = np.zeros_like(own)
+    for shift_bits, masks in ((np.left_shift, LEFT_MASKS), (np.right_shift, RIGHT_MASKS)):
+        line_opp = opp & masks  # Opponent pieces that can be flooded in each direction
+        line = shift_bits(own, SHIFTS) & line_opp
+        for i in range(5):
+            line |= shift_bits(line, SHIFTS) & line_opp
+        moves |= np.bitwise_or.reduce(shift_bits(line, SHIFTS) & masks, axis=0)
+    return moves & empty
+
+
+def unpackBits(bits):
+    # (N, 64) array of 0 and 1 with the bits of the N bitboards of <bits>, column i is bit i.
+    return np.unpackbits(bits.astype('<u8').view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+
+
+def packBits(spaces):
+    # Inverse of unpackBits: (N,) bitboards from an (N, 64) array of booleans.
+    return np.packbits(spaces.astype(np.uint8), axis=1, bitorder='little').view('<u8').reshape(-1)
+
+
+def patternIndices(own_spaces, opp_spaces):
+    # (N, instances) array of the indices of engine.patternIndices, from the arrays of unpackBits.
+    digits = np.zeros((len(own_spaces), 65), dtype=np.int32)
+    digits[:, :64] = own_spaces + 2 * opp_spaces
+    return (digits[:, INSTANCE_SQUARES] * INSTANCE_POWERS).sum(axis=2) + INSTANCE_OFFSETS
+
+
+def evaluatePatterns(own, opp, computer_to_move, weights):
+    # engine.PatternEvaluation.score of the positions of evaluateBitboards.
+    own_spaces = unpackBits(own)
+    opp_spaces = unpackBits(opp)
+    table = np.frombuffer(weights.weights, dtype=np.int16)  # All the stages one after the other
+    empties = 64 - own_spaces.sum(axis=1, dtype=np.int32) - opp_spaces.sum(axis=1, dtype=np.int32)
+    base = np.minimum((60 - empties) // engine.PATTERN_STAGE_EMPTIES, engine.PATTERN_STAGES - 1) * engine.STAGE_WEIGHTS
+    values = table[base[:, None] + patternIndices(own_spaces, opp_spaces)].sum(axis=1, dtype=np.int32)
+    n_moves = np.minimum(popcount(validMoves(np.concatenate((own, opp)), np.concatenate((opp, own)))),
+                         engine.MOBILITY_MOVES - 1)
+    values += table[base + engine.MOBILITY_OFFSET + n_moves[:len(own)] * engine.MOBILITY_MOVES + n_moves[len(own):]]
+    values += table[base + engine.TURN_OFFSET + np.where(computer_to_move, 0, 1)]
+    return np.clip(values, engine.EVAL_MIN, engine.EVAL_MAX)
+
+
+def evaluateBitboards(own, opp, computer_to_move=True):
+    # engine.evaluateBoard of N positions given as two arrays of N bitboards (the ints of
+    # engine.boardToBitboards): <own> with the pieces of the computer and <opp> with the pieces
+    # of its opponent. <computer_to_move> (one bool for all or an array) only matters to the
+    # pattern evaluation, h doesn't depend on the side to move.
+    own = np.asarray(own, dtype=np.uint64).reshape(-1)
+    opp = np.asarray(opp, dtype=np.uint64).reshape(-1)
+    weights = engine.getPatternWeights()
+    if weights is not None:
+        return evaluatePatterns(own, opp, computer_to_move, weights)
+    own_spaces = unpackBits(own)
+    opp_spaces = unpackBits(opp)
+    empty_spaces = 1 - own_spaces - opp_spaces
+    values = own_spaces @ OWN_WEIGHTS + opp_spaces @ OPPONENT_WEIGHTS + empty_spaces @ EMPTY_WEIGHTS
+    own_cx = own_spaces[:, CX_SQUARES]
+    values += (own_cx * np.where(own_spaces[:, CX_CORNERS] == 1, 20, CX_PENALTIES)).sum(axis=1, dtype=np.int32)
+    n_moves = popcount(validMoves(np.concatenate((own, opp)), np.concatenate((opp, own))))
+    values += POSSIBLE_MOVES_VALUE[n_moves[:len(own)]]
+    values += OPPONENT_MOVES_VALUE[n_moves[len(own):]]
+    return values
+
+
+def evaluateArray(boards):
+    # evaluateBitboards of the boards of an (N, 8, 8) int8 array indexed [n, x, y] like the
+    # engine boards, with 1 for the pieces of the computer, -1 for the ones of its opponent and
+    # 0 for empty.
+    boards = np.asarray(boards).reshape(-1, 64)
+    return evaluateBitboards(packBits(boards == 1), packBits(boards == -1))
+
+
+def boardsToArray(boards, computer_tile):
+    # (N, 8, 8) int8 array of evaluateArray from a list of engine boards.
+    opponent_tile = engine.opponent(computer_tile)
+    return np.array([[[1 if tile == computer_tile else -1 if tile == opponent_tile else 0 for tile in column]
+                      for column in board] for board in boards], dtype=np.int8)
+
+
+def evaluateBoards(boards, computer_tile):
+    # evaluateBitboards for <computer_tile> of each board of the list <boards>.
+    pairs = [engine.boardToBitboards(board, computer_tile) for board in boards]
+    return evaluateBitboards([own for own, _ in pairs], [opp for _, opp in pairs])
+
+
+def evaluateChildren(position, computer_tile, moves, tile=None):
+    # engine.evaluateBoard for <computer_tile> of the positions after <tile> (the computer if not
+    # given) plays each of <moves> on the engine.Position <position>, without making them.
+    own, opp = position.bitboards(computer_tile)
+    children_own = []
+    children_opp = []
+    for x, y in moves:
+        if tile is None or tile == computer_tile:
+            flips = engine.bbFlips(own, opp, x * 8 + y)
+            children_own.append(own | flips | (1 << (x * 8 + y)))
+            children_opp.append(opp ^ flips)
+        else:
+            flips = engine.bbFlips(opp, own, x * 8 + y)
+            children_own.append(own ^ flips)
+            children_opp.append(opp | flips | (1 << (x * 8 + y)))
+    return evaluateBitboards(children_own, children_opp, tile is not None and tile != computer_tile)
@@ -0,0 +1,162 @@
+# Benchmark of the Othello engine on a fixed set of positions: every position is
+# searched at depths 1, 2, ... up to --depth (as the iterative deepening of
+# getComputerMove does) and the endgame ones are also solved exactly. The output
+# is JSON, so two runs can be compared with --compare to catch performance changes.
+#   python othello.py bench --depth 6 --seed 0 --output bench.json
+#   python othello.py bench --compare bench.json
+
+import argparse, json, platform, sys, time
+
+import engine
+
+# (name, phase, board as in engine.boardFromString, side to move). Positions reached by
+# random play from the start position.
+BENCHMARK_POSITIONS = [
+    ('opening-1', 'opening', '------------B------BB------WB-----WBBB--------------------------', 'W'),
+    ('opening-2', 'opening', '----------------------B----WWB-----WB------WB-----BW------------', 'B'),
+    ('opening-3', 'opening', '-------------W------W-B--WWWBB-----WBB-----W-B------------------', 'W'),
+    ('opening-4', 'opening', '-------------B---W-W-B----WWWBB----WBB-----W-B------------------', 'B'),
+    ('midgame-1', 'midgame', '---------WBBB-----WBWW-----WBW-----WBB-B--WWBWB---BW-BB-----W---', 'W'),
+    ('midgame-2', 'midgame', '---------BW--B----WWWWW---WBBBB---WWBBB---WBBW---W-B-BBB---B----', 'B'),
+    ('midgame-3', 'midgame', '--B--WW---BBWWB---BWWW----BBWWBB--BBWB---BB-BWB-B--BWB-B--B-----', 'W'),
+    ('midgame-4', 'midgame', '------B---W--B----WWBW--W-WBWWWWBBWWBW-WBBWBWBBW-WWW---WWWW-----', 'B'),
+    ('endgame-1', 'endgame', '-B-W-BW---W-WWBW-WWWWBWW-BWWBWWWBBBBWWWW-BBBBBWW-BBWW--W-BBBBBB-', 'W'),
+    ('endgame-2', 'endgame', '--BBBB----BWWWW---BWWWWB-BBBWWWBBBBBBBW-BWWWBBWWBB-BBWBB--BBBBBB', 'B'),
+    ('endgame-3', 'endgame', '-WB-WWWW-BWBWWWWBBBWWWBB--WWWWBBWWWWBWBBBBBBBBBB--WWWWWB--WWW--B', 'W'),
+    ('endgame-4', 'endgame', 'W-B-BWB-BBBBWWWW-BWWBWW--WWWWWWW-WBBBBW-WBWBWWBB-BB-WBBBBBWWBBBB', 'B'),
+]
+
+
+def benchmarkPosition(board, tile, max_depth, seed, table):
+    # Searches <board> for <tile> at every depth up to <max_depth> reusing <table> between
+    # depths, and returns the results of each depth.
+    engine.setSearchSeed(seed)
+    table.clear()
+    ordering = engine.MoveOrdering()
+    results = []
+    time_to_depth = 0
+    score = None
+    for depth in range(1, max_depth + 1):
+        nodes = engine.NODES_SEARCHED
+        start = time.perf_counter()
+        position = engine.boardToPosition(board, tile)
+        score, best_move = engine.aspirationSearch(position, depth, tile, score, table, engine.zobristHash(board, tile),
+                                                   None, engine.newEvaluation(position, tile), None, ordering)
+        elapsed = time.perf_counter() - start
+        nodes = engine.NODES_SEARCHED - nodes
+        time_to_depth += elapsed
+        results.append({'depth': depth, 'score': score, 'best_move': list(best_move), 'nodes': nodes,
+                        'time': round(elapsed, 6), 'time_to_depth': round(time_to_depth, 6),
+                        'nps': round(nodes / elapsed) if elapsed else None})
+    return results
+
+
+def benchmarkSolve(board, tile):
+    # Solves the endgame of <board> exactly and returns its result, nodes and time.
+    nodes = engine.NODES_SEARCHED
+    start = time.perf_counter()
+    score, best_move = engine.solveEndgame(board, tile)
+    elapsed = time.perf_counter() - start
+    nodes = engine.NODES_SEARCHED - nodes
+    return {'score': score, 'best_move': best_move, 'outcome': engine.endgameOutcome(score), 'nodes': nodes,
+            'time': round(elapsed, 6), 'nps': round(nodes / elapsed) if elapsed else None}
+
+
+def benchmarkFunction(function, calls, repeat):
+    # Times <function> called with every argument tuple in <calls>, <repeat> times.
+    start = time.perf_counter()
+    for i in range(repeat):
+        for args in calls:
+            function(*args)
+    elapsed = time.perf_counter() - start
+    n_calls = repeat * len(calls)
+    return {'calls': n_calls, 'time': round(elapsed, 6), 'us_per_call': round(elapsed / n_calls * 1e6, 3)}
+
+
+def runBenchmark(max_depth, seed, phases, tt_mb, repeat):
+    table = engine.TranspositionTable(tt_mb)
+    positions = []
+    boards = []
+    for name, phase, text, side in BENCHMARK_POSITIONS:
+        if phase not in phases:
+            continue
+        board = engine.boardFromString(text)
+        tile = engine.BLACK_TILE if side == 'B' else engine.WHITE_TILE
+        boards.append((board, tile))
+        empties = text.count('-')
+        position = {'name': name, 'phase': phase, 'board': text, 'side': side, 'empties': empties,
+                    'search': benchmarkPosition(board, tile, max_depth, seed, table)}
+        if empties <= engine.ENDGAME_EMPTIES:
+            position['solve'] = benchmarkSolve(board, tile)
+        positions.append(position)
+
+    total_nodes = sum(result['nodes'] for position in positions for result in position['search'])
+    total_time = sum(position['search'][-1]['time_to_depth'] for position in positions)
+    return {
+        'python': platform.python_version(), 'max_depth': max_depth, 'seed': seed, 'tt_mb': tt_mb,
+        'probcut': engine.PROBCUT_THRESHOLD, 'lmr': engine.LMR_REDUCTION,
+        'positions': positions,
+        'functions': {
+            'h': benchmarkFunction(engine.h, [(engine.boardToPosition(board, tile), tile) for board, tile in boards],
+                                   repeat),
+            'evaluateBoard': benchmarkFunction(engine.evaluateBoard, [(engine.boardToPosition(board, tile), tile)
+                                                                      for board, tile in boards], repeat),
+            'getValidMoves': benchmarkFunction(engine.getValidMoves, boards, repeat),
+        },
+        'totals': {'nodes': total_nodes, 'time': round(total_time, 6),
+                   'nps': round(total_nodes / total_time) if total_time else None},
+    }
+
+
+def compareRuns(baseline, current):
+    # Prints for each position the time to the deepest common depth and its nodes in both
+    # runs. Different node counts mean the search itself changed, not only its speed.
+    print('%-10s %5s %12s %12s %7s %10s %10s' % ('position', 'depth', 'base time', 'time', 'ratio', 'base nodes', 'nodes'))
+    base_positions = {position['name']: position for position in baseline['positions']}
+    for position in current['positions']:
+        base = base_positions.get(position['name'])
+        if base is None:
+            continue
+        depth = min(len(base['search']), len(position['search']))
+        old, new = base['search'][depth - 1], position['search'][depth - 1]
+        ratio = new['time_to_depth'] / old['time_to_depth'] if old['time_to_depth'] else float('nan')
+        print('%-10s %5d %12.4f %12.4f %7.2f %10d %10d%s' % (
+            position['name'], depth, old['time_to_depth'], new['time_to_depth'], ratio, old['nodes'], new['nodes'],
+            '' if old['nodes'] == new['nodes'] and old['best_move'] == new['best_move'] else '  search changed'))
+    for name, result in current['functions'].items():
+        if name in baseline['functions']:
+            print('%-14s %10.3f us/call  (was %.3f)' % (name, result['us_per_call'], baseline['functions'][name]['us_per_call']))
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='othello.py bench', description='Benchmark the engine on fixed positions.')
+    parser.add_argument('--depth', type=int, default=6, help='deepest minimax search of every position')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the random move shuffles of the search')
+    parser.add_argument('--phases', nargs='+', default=['opening', 'midgame', 'endgame'],
+                        choices=['opening', 'midgame', 'endgame'], help='positions to run')
+    parser.add_argument('--tt-mb', type=int, default=engine.TT_SIZE_MB, help='size of the transposition table')
+    parser.add_argument('--repeat', type=int, default=20, help='times h and getValidMoves go over the positions')
+    parser.add_argument('--output', default='-', help="JSON file with the results, '-' for stdout")
+    parser.add_argument('--compare', default=None, help='JSON of a previous run to compare with')
+    parser.add_argument('--probcut', type=float, default=engine.PROBCUT_THRESHOLD,
+                        help='ProbCut threshold in sigmas, lower prunes more (0 or less turns it off)')
+    parser.add_argument('--lmr', type=int, default=engine.LMR_REDUCTION, help='plies of late move reductions, 0 for none')
+    args = parser.parse_args(argv)
+
+    engine.PROBCUT_THRESHOLD = args.probcut if args.probcut is not None and args.probcut > 0 else None
+    engine.LMR_REDUCTION = args.lmr
+    results = runBenchmark(args.depth, args.seed, args.phases, args.tt_mb, args.repeat)
+    if args.output == '-':
+        if args.compare is None:
+            json.dump(results, sys.stdout, indent=1)
+            print()
+    else:
+        with open(args.output, 'w') as out:
+            json.dump(results, out, indent=1)
+    if args.compare is not None:
+        with open(args.compare) as baseline:
+            compareRuns(json.load(baseline), results)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,91 @@
+# Builds the opening book of the engine: every position reachable in the first
+# plies of the game is searched deep (positions that are symmetric versions of
+# each other only once) and the best moves are written to a sorted binary file
+# that engine.OpeningBook reads through mmap. It doesn't need pygame, run it with:
+#   python othello.py book --plies 6 --depth 9 --workers 8 --output book.bin
+
+import argparse, sys, time
+import concurrent.futures
+
+import engine
+
+
+def bookPositions(plies):
+    # Returns {canonical key: (board, tile to move)} of all the positions reachable from
+    # the start position in <plies> moves or less, one board for each set of symmetric ones.
+    board = engine.getNewBoard()
+    engine.resetBoard(board)
+    tile = engine.BLACK_TILE
+    positions = {engine.canonicalHash(board, tile)[0]: (board, tile)}
+    frontier = [(board, tile)]
+    for ply in range(plies):
+        next_frontier = []
+        for board, tile in frontier:
+            possible_moves = engine.getValidMoves(board, tile)[0]
+            if not possible_moves:
+                continue  # The game is over or the player passes, too rare to be in the book
+            for x, y in possible_moves:
+                child = [column[:] for column in board]
+                engine.makeMove(child, tile, x, y)
+                key = engine.canonicalHash(child, engine.opponent(tile))[0]
+                if key not in positions:
+                    positions[key] = (child, engine.opponent(tile))
+                    next_frontier.append((child, engine.opponent(tile)))
+        frontier = next_frontier
+    return positions
+
+
+def searchPosition(board, tile, depth, seed):
+    # Searches <board> for <tile> as getComputerMove does without time limit and returns the
+    # canonical key of the position, the best move in the canonical board, depth and score.
+    engine.setSearchSeed(seed)
+    table = engine.getTranspositionTable()
+    table.clear()
+    ordering = engine.MoveOrdering()
+    key = engine.zobristHash(board, tile)
+    if tile == engine.WHITE_TILE:
+        key ^= engine.ZOBRIST_WHITE_COMPUTER
+    position = engine.boardToPosition(board, tile)
+    evaluation = engine.newEvaluation(position, tile)
+    score = None
+    for iteration_depth in range(1, depth + 1):
+        score, best_move = engine.aspirationSearch(position, iteration_depth, tile, score, table, key, None,
+                                                   evaluation, None, ordering)
+    canonical_key, symmetry = engine.canonicalHash(board, tile)
+    x, y = engine.transformMove(symmetry, best_move[0], best_move[1])
+    return canonical_key, x * 8 + y, depth, score
+
+
+def writeBook(path, entries, plies, depth):
+    # Writes the (key, move, depth, score) <entries> in the format of engine.OpeningBook.
+    entries = sorted(entries)
+    with open(path, 'wb') as out:
+        out.write(engine.OpeningBook.HEADER.pack(engine.OpeningBook.MAGIC, len(entries), plies, depth))
+        for entry in entries:
+            out.write(engine.OpeningBook.ENTRY.pack(*entry))
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='othello.py book', description='Build the opening book of the engine.')
+    parser.add_argument('--plies', type=int, default=6, help='positions up to this many moves from the start')
+    parser.add_argument('--depth', type=int, default=9, help='search depth of every position')
+    parser.add_argument('--workers', type=int, default=1, help='number of processes searching positions')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the random move shuffles of the search')
+    parser.add_argument('--output', default=engine.BOOK_FILE, help='book file to write')
+    args = parser.parse_args(argv)
+
+    positions = bookPositions(args.plies)
+    start = time.time()
+    entries = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [executor.submit(searchPosition, board, tile, args.depth, args.seed)
+                   for board, tile in positions.values()]
+        for future in concurrent.futures.as_completed(futures):
+            entries.append(future.result())
+    writeBook(args.output, entries, args.plies, args.depth)
+    print('%d positions searched to depth %d in %.1f s, written to %s' % (
+        len(entries), args.depth, time.time() - start, args.output), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,2233 @@
+# Othello engine: the rules of the game, the evaluation and the minimax search
+# of Flippy, without any GUI code, so it can be imported without pygame.
+#
+# Rules by Al Sweigart al@inventwithpython.com, from Flippy
+# (http://inventwithpython.com/pygame), released under a "Simplified BSD" license.
+# Minimax algorithm by Sergi Magret Goy on 22/05/2020
+
+import random, time, math
+import atexit, mmap, os.path, struct, sys
+from array import array
+
+BOARDWIDTH = 8  # how many columns of spaces on the game board
+BOARDHEIGHT = 8  # how many rows of spaces on the game board
+WHITE_TILE = 'WHITE_TILE'  # an arbitrary but unique value
+BLACK_TILE = 'BLACK_TILE'  # an arbitrary but unique value
+EMPTY_SPACE = 'EMPTY_SPACE'  # an arbitrary but unique value
+AI_MAX_DEPTH = 10  # deepest search the computer runs for a move
+AI_TIME_LIMIT = 3  # seconds the computer can think on each move, None to always search to AI_MAX_DEPTH
+ENDGAME_EMPTIES = 12  # with this many empty spaces or less the computer plays the game out perfectly
+ENDGAME_TIME_SHARE = 0.5  # part of the time limit the endgame solver gets, the search falls back on the rest
+PONDER_PREDICTION_DEPTH = 4  # search depth used to guess the opponent's move when pondering
+
+# Bitboards: every colour is packed into a 64-bit integer where the space
+# board[x][y] is the bit number x * 8 + y, so walking the bits from the
+# lowest to the highest visits the spaces in the same order as the
+# "for x ... for y ..." loops used by the list-of-lists board.
+FULL_MASK = 0xFFFFFFFFFFFFFFFF
+NOT_FIRST_ROW = 0xFEFEFEFEFEFEFEFE  # every bit except the ones with y == 0
+NOT_LAST_ROW = 0x7F7F7F7F7F7F7F7F  # every bit except the ones with y == 7
+
+# (shift, mask) pairs for the eight directions. A positive shift moves the
+# bits to the left, a negative one to the right, and the mask clears the
+# bits that wrapped around from one column to the next one.
+BB_LEFT_SHIFTS = [(8, FULL_MASK), (9, NOT_FIRST_ROW), (1, NOT_FIRST_ROW), (7, NOT_LAST_ROW)]  # x+1 / x+1,y+1 / y+1 / x+1,y-1
+BB_RIGHT_SHIFTS = [(8, FULL_MASK), (9, NOT_LAST_ROW), (1, NOT_LAST_ROW), (7, NOT_FIRST_ROW)]  # x-1 / x-1,y-1 / y-1 / x-1,y+1
+
+# The four 4x4 quadrants of the board, used by the endgame solver to play first
+# in the regions with an odd number of empty spaces (parity).
+QUADRANT_MASKS = [0x0F0F0F0F, 0xF0F0F0F0, 0x0F0F0F0F << 32, 0xF0F0F0F0 << 32]
+
+# Zobrist hashing: a random 64-bit key for every (tile, space) pair, XORed
+# together for all the pieces on the board, plus one key for the side to move
+# and one for the colour the computer plays (the scores of h depend on it).
+# The generator is seeded so every process computes the same hashes.
+_zobristRandom = random.Random(22052020)
+ZOBRIST_PIECES = {WHITE_TILE: [_zobristRandom.getrandbits(64) for i in range(64)],
+                  BLACK_TILE: [_zobristRandom.getrandbits(64) for i in range(64)]}
+ZOBRIST_FLIP = [ZOBRIST_PIECES[WHITE_TILE][i] ^ ZOBRIST_PIECES[BLACK_TILE][i] for i in range(64)]
+ZOBRIST_WHITE_TO_MOVE = _zobristRandom.getrandbits(64)
+ZOBRIST_WHITE_COMPUTER = _zobristRandom.getrandbits(64)
+
+# Lookup tables built once at import, indexed by the bit number of a space
+# (x * 8 + y), so the evaluation and the move generator read a list instead of
+# going through the chains of comparisons of isCorner, isEdge, isC and isX.
+DIRECTIONS = [(-1, -1), (0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0)]  # in the order surroundedBy checks them
+IS_CORNER = [x in (0, 7) and y in (0, 7) for x in range(8) for y in range(8)]
+IS_EDGE = [(x in (0, 7) or y in (0, 7)) and not (x in (0, 7) and y in (0, 7)) for x in range(8) for y in range(8)]
+IS_C = [(x in (1, 6) and y in (0, 7)) or (x in (0, 7) and y in (1, 6)) for x in range(8) for y in range(8)]
+IS_X = [x in (1, 6) and y in (1, 6) for x in range(8) for y in range(8)]
+# Bucket of each space in reorderMoves: corners, other spaces, Cs and Xs
+SQUARE_ORDER = [0 if IS_CORNER[i] else 2 if IS_C[i] else 3 if IS_X[i] else 1 for i in range(64)]
+# The (x, y) neighbours of every space that are on the board
+NEIGHBOURS = [[(x + dx, y + dy) for dx, dy in DIRECTIONS if 0 <= x + dx < 8 and 0 <= y + dy < 8]
+              for x in range(8) for y in range(8)]
+# The corners next to every space (only the C and X spaces have one)
+ADJACENT_CORNERS = [[(nx, ny) for nx, ny in NEIGHBOURS[i] if IS_CORNER[nx * 8 + ny]] for i in range(64)]
+# The same as bitboards, and the neighbours of every space as a bitboard
+ADJACENT_CORNER_BITS = [sum(1 << (x * 8 + y) for x, y in ADJACENT_CORNERS[i]) for i in range(64)]
+NEIGHBOUR_BITS = [sum(1 << (x * 8 + y) for x, y in NEIGHBOURS[i]) for i in range(64)]
+# For every space and direction, the bits of the spaces from it to the edge of the board
+RAYS = [[[1 << ((x + k * dx) * 8 + y + k * dy) for k in range(1, 8) if 0 <= x + k * dx < 8 and 0 <= y + k * dy < 8]
+         for dx, dy in DIRECTIONS] for x in range(8) for y in range(8)]
+RAYS = [[ray for ray in rays if len(ray) > 1] for rays in RAYS]  # Flipping needs two spaces at least
+# squareValue of a computer piece (but the C/X bonus), an opponent piece and an empty space
+OWN_SQUARE_VALUE = [5 * len(NEIGHBOURS[i]) + 1 + 100 * IS_CORNER[i] + 20 * IS_EDGE[i] for i in range(64)]
+OPPONENT_SQUARE_VALUE = [-2 * len(NEIGHBOURS[i]) - 1 - 100 * IS_CORNER[i] - 10 * IS_EDGE[i] + 50 * IS_C[i] + 90 * IS_X[i]
+                         for i in range(64)]
+EMPTY_SQUARE_VALUE = [-2 * len(NEIGHBOURS[i]) for i in range(64)]
+# Value of a computer piece on a C or X space without its corner
+CX_PENALTY = [-50 if IS_C[i] else -90 if IS_X[i] else 0 for i in range(64)]
+# Range of h: the mobility terms are between -50 and 50 each, and every space adds its
+# squareValue, at most the best and at least the worst of its three possible states.
+EVAL_MAX = 50 + 50 + sum(max(OWN_SQUARE_VALUE[i] + (20 if CX_PENALTY[i] else 0), OPPONENT_SQUARE_VALUE[i],
+                             EMPTY_SQUARE_VALUE[i]) for i in range(64))
+EVAL_MIN = -50 - 50 + sum(min(OWN_SQUARE_VALUE[i] + CX_PENALTY[i], OPPONENT_SQUARE_VALUE[i], EMPTY_SQUARE_VALUE[i])
+                          for i in range(64))
+# A finished game scores WIN_SCORE plus the final difference of pieces (or minus WIN_SCORE
+# plus it when lost), so any win is better than any board h can value (the pattern evaluation
+# is kept in the same range), and a draw scores 0.
+WIN_SCORE = max(EVAL_MAX, -EVAL_MIN) + 1
+SCORE_BOUND = WIN_SCORE + 65  # every score of the search is inside ]-SCORE_BOUND, SCORE_BOUND[
+ASPIRATION_WINDOW = 100  # half width of the first window around the score of the previous iteration
+PROBCUT_THRESHOLD = 1.5  # sigmas past the window a shallow search must be for ProbCut to cut, None to turn it off
+# Plies less searched at first for the late moves of a node, 0 to turn the reductions off. An
+# odd reduction changes the side that moves last before the leaves, and the evaluation is
+# biased towards it.
+LMR_REDUCTION = 2
+LMR_MIN_DEPTH = 4  # moves are only reduced with this depth left or more
+LMR_MIN_MOVE = 3  # the first LMR_MIN_MOVE moves of a node are never reduced
+
+TT_SIZE_MB = 32  # memory budget of the transposition table used by getComputerMove
+EXACT_BOUND = 0  # the stored score is the exact minimax value
+LOWER_BOUND = 1  # the search failed high, the value is at least the stored score
+UPPER_BOUND = 2  # the search failed low, the value is at most the stored score
+
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'book.bin')  # opening book of getComputerMove
+
+
+def symmetricSquare(symmetry, x, y):
+    # Space (x * 8 + y) where [x, y] goes with one of the 8 symmetries of the board (rotations
+    # and reflections), numbered 0 to 7: bit 2 swaps x and y, then bit 0 mirrors x and bit 1 y.
+    if symmetry & 4:
+        x, y = y, x
+    if symmetry & 1:
+        x = 7 - x
+    if symmetry & 2:
+        y = 7 - y
+    return x * 8 + y
+
+
+# SYMMETRIES[s][x * 8 + y] is where [x, y] goes with the symmetry s, SYMMETRIES_INVERSE[s] brings it back
+SYMMETRIES = [[symmetricSquare(symmetry, x, y) for x in range(8) for y in range(8)] for symmetry in range(8)]
+SYMMETRIES_INVERSE = [[symmetry.index(square) for square in range(64)] for symmetry in SYMMETRIES]
+
+
+def resetBoard(board):
+    # Blanks out the board it is passed, and sets up starting tiles.
+    for x in range(BOARDWIDTH):
+        for y in range(BOARDHEIGHT):
+            board[x][y] = EMPTY_SPACE
+
+    # Add starting pieces to the center
+    board[3][3] = WHITE_TILE
+    board[3][4] = BLACK_TILE
+    board[4][3] = BLACK_TILE
+    board[4][4] = WHITE_TILE
+
+
+def getNewBoard():
+    # Creates a brand new, empty board data structure.
+    board = []
+    for i in range(BOARDWIDTH):
+        board.append([EMPTY_SPACE] * BOARDHEIGHT)
+
+    return board
+
+
+def boardToString(board):
+    # Returns <board> as a string of 64 characters, 'B' for black, 'W' for white and '-'
+    # for empty, going through the rows (y) from top to bottom and each row from left to right.
+    return ''.join('B' if board[x][y] == BLACK_TILE else 'W' if board[x][y] == WHITE_TILE else '-'
+                   for y in range(BOARDHEIGHT) for x in range(BOARDWIDTH))
+
+
+def boardFromString(text):
+    # Inverse of boardToString, builds a new board from its 64 characters (whitespace is ignored).
+    text = ''.join(text.split())
+    if len(text) != BOARDWIDTH * BOARDHEIGHT or set(text) - set('BW-'):
+        raise ValueError('a board needs 64 characters among B, W and -: %r' % text)
+    board = getNewBoard()
+    for i, char in enumerate(text):
+        if char != '-':
+            board[i % BOARDWIDTH][i // BOARDWIDTH] = BLACK_TILE if char == 'B' else WHITE_TILE
+    return board
+
+
+def boardToBitboards(board, tile):
+    # Packs the list-of-lists <board> into two 64-bit integers, the first one
+    # with the pieces of <tile> and the second one with the pieces of its opponent.
+    # Any other value on the board (empty spaces, hints) is left out of both.
+    own = 0
+    opp = 0
+    otherTile = opponent(tile)
+    bit = 1
+    for column in board:
+        for space in column:
+            if space == tile:
+                own |= bit
+            elif space == otherTile:
+                opp |= bit
+            bit <<= 1
+    return own, opp
+
+
+def bitboardsToBoard(own, opp, tile):
+    # Inverse of boardToBitboards, builds a new list-of-lists board where the bits
+    # of <own> are pieces of <tile> and the bits of <opp> pieces of its opponent.
+    board = getNewBoard()
+    otherTile = opponent(tile)
+    for x, y in bbToSpaces(own):
+        board[x][y] = tile
+    for x, y in bbToSpaces(opp):
+        board[x][y] = otherTile
+    return board
+
+
+def bbToSpaces(bits):
+    # Returns the list of (x, y) spaces of the bits set in <bits>, in the same
+    # order as a "for x ... for y ..." loop over the board.
+    spaces = []
+    while bits:
+        lowest = bits & -bits
+        square = lowest.bit_length() - 1
+        spaces.append((square >> 3, square & 7))
+        bits ^= lowest
+    return spaces
+
+
+def bbValidMoves(own, opp):
+    # Returns a bitboard with all the empty spaces where the owner of <own> can
+    # move. For each direction the opponent pieces adjacent to our pieces are
+    # flooded along the direction (at most 6 in a row fit on the board), and
+    # the first empty space right after one of those lines is a valid move.
+    empty = ~(own | opp) & FULL_MASK
+    moves = 0
+    for shift, mask in BB_LEFT_SHIFTS:
+        line = (own << shift) & mask & opp
+        line |= (line << shift) & mask & opp
+        line |= (line << shift) & mask & opp
+        line |= (line << shift) & mask & opp
+        line |= (line << shift) & mask & opp
+        line |= (line << shift) & mask & opp
+        moves |= (line << shift) & mask & empty
+    for shift, mask in BB_RIGHT_SHIFTS:
+        line = (own >> shift) & mask & opp
+        line |= (line >> shift) & mask & opp
+        line |= (line >> shift) & mask & opp
+        line |= (line >> shift) & mask & opp
+        line |= (line >> shift) & mask & opp
+        line |= (line >> shift) & mask & opp
+        moves |= (line >> shift) & mask & empty
+    return moves
+
+
+def bbFlips(own, opp, square):
+    # Returns the bitboard of the opponent pieces flipped by the owner of <own>
+    # moving on bit number <square>, 0 if the move doesn't flip anything.
+    # Each direction walks the precomputed ray of spaces to the edge of the board.
+    flips = 0
+    for ray in RAYS[square]:
+        line = 0
+        for bit in ray:
+            if bit & opp:
+                line |= bit
+            else:
+                if bit & own:
+                    flips |= line
+                break
+    return flips
+
+
+def isValidMove(board, tile, xstart, ystart):
+    # Returns False if the player's move is invalid. If it is a valid
+    # move, returns a list of spaces of the captured pieces.
+    if not isOnBoard(xstart, ystart) or board[xstart][ystart] != EMPTY_SPACE:
+        return False
+
+    own, opp = boardToBitboards(board, tile)
+    flips = bbFlips(own, opp, xstart * 8 + ystart)
+    if not flips:  # If no tiles flipped, this move is invalid
+        return False
+    return bbToSpaces(flips)
+
+
+def isOnBoard(x, y):
+    # Returns True if the coordinates are located on the board.
+    return 0 <= x < BOARDWIDTH and 0 <= y < BOARDHEIGHT
+
+
+def getValidMoves(board, tile):
+    # Returns a list of (x,y) tuples of all valid moves.
+    validMoves = []
+    tiles_to_flip = []
+    reorder = False
+
+    own, opp = boardToBitboards(board, tile)
+    for x, y in bbToSpaces(bbValidMoves(own, opp)):
+        validMoves.append((x, y))
+        tiles_to_flip.append(bbFlips(own, opp, x * 8 + y).bit_count())
+        if not reorder and SQUARE_ORDER[x * 8 + y] != 1:  # If there is not a special tile to reorder and the current tile is special, then we set reorder to True
+            reorder = True
+
+    return validMoves, tiles_to_flip, reorder
+
+
+def getScoreOfBoard(board):
+    # Determine the score by counting the tiles.
+    xscore = 0
+    oscore = 0
+    for x in range(BOARDWIDTH):
+        for y in range(BOARDHEIGHT):
+            if board[x][y] == WHITE_TILE:
+                xscore += 1
+            if board[x][y] == BLACK_TILE:
+                oscore += 1
+    return {WHITE_TILE: xscore, BLACK_TILE: oscore}
+
+
+def makeMove(board, tile, xstart, ystart):
+    # Place the tile on the board at xstart, ystart, and flip tiles
+    # Returns False if this is an invalid move, tilesToFlip if it is valid.
+    # The search plays on a Position instead, see Position.makeMove.
+    tilesToFlip = isValidMove(board, tile, xstart, ystart)
+    if not tilesToFlip:
+        return False
+
+    board[xstart][ystart] = tile
+    for x, y in tilesToFlip:
+        board[x][y] = tile
+    return tilesToFlip
+
+
+def undoMove(board, tile, xstart, ystart, tiles_to_flip):
+    # Takes back a makeMove instead of copying the board.
+    # Remove a move from the board, [<xstart>,<ystart>] i assigned as empty
+    # then all the tiles that have been flipped are flipped over to reassign them to the opponent of <tile>
+
+    if not tiles_to_flip:
+        return False
+
+    board[xstart][ystart] = EMPTY_SPACE
+
+    for x, y in tiles_to_flip:
+        board[x][y] = opponent(tile)
+    return True
+
+
+# perft counts of the start position (black to move) for each depth, the same for every
+# correct move generator.
+PERFT_COUNTS = [1, 4, 12, 56, 244, 1396, 8200, 55092, 390216, 3005288, 24571284]
+
+
+class Position:
+    # A board with its side to move, in the compact form the search, h and the GUI share:
+    # the pieces as two bitboards (bit x * 8 + y as in boardToBitboards) and the number of
+    # pieces of each side, kept up to date by makeMove and undoMove instead of counting the
+    # board again. The moves of each side are only generated when asked for and kept until
+    # the position changes, and undoMove gives back the ones the position had before the
+    # move, so going back up the search tree never generates them again.
+    __slots__ = ('black', 'white', 'tile', 'black_count', 'white_count', 'black_moves', 'white_moves', 'move_list',
+                 'history')
+
+    def __init__(self, black, white, tile):
+        self.black = black
+        self.white = white
+        self.tile = tile  # side to move
+        self.black_count = black.bit_count()
+        self.white_count = white.bit_count()
+        self.black_moves = None  # bitboard of the moves of each side, None until needed
+        self.white_moves = None
+        self.move_list = None  # (moves, flips of each one, reorder) of the side to move, None until needed
+        self.history = []  # what undoMove needs: (square, flips, black_moves, white_moves, move_list)
+
+    def copy(self):
+        # The same position without the moves played to reach it (they can't be undone).
+        return Position(self.black, self.white, self.tile)
+
+    def toBoard(self):
+        # The position as a new list-of-lists board.
+        return bitboardsToBoard(self.black, self.white, BLACK_TILE)
+
+    def bitboards(self, tile):
+        # (pieces of <tile>, pieces of its opponent), as boardToBitboards.
+        if tile == BLACK_TILE:
+            return self.black, self.white
+        return self.white, self.black
+
+    def get(self, x, y):
+        # The tile on [x, y] or EMPTY_SPACE, like board[x][y].
+        bit = 1 << (x * 8 + y)
+        if self.black & bit:
+            return BLACK_TILE
+        elif self.white & bit:
+            return WHITE_TILE
+        return EMPTY_SPACE
+
+    def scores(self):
+        # Same dict as getScoreOfBoard, without looking at the board.
+        return {WHITE_TILE: self.white_count, BLACK_TILE: self.black_count}
+
+    def empties(self):
+        return 64 - self.black_count - self.white_count
+
+    def movesBitboard(self, tile):
+        # Bitboard of the spaces where <tile> can move.
+        if tile == BLACK_TILE:
+            if self.black_moves is None:
+                self.black_moves = bbValidMoves(self.black, self.white)
+            return self.black_moves
+        if self.white_moves is None:
+            self.white_moves = bbValidMoves(self.white, self.black)
+        return self.white_moves
+
+    def canMove(self, tile):
+        return self.movesBitboard(tile) != 0
+
+    def validMoves(self):
+        # The moves of the side to move as getValidMoves returns them: the (x, y) moves, the
+        # number of tiles each one flips and if any of them is on a corner, C or X space.
+        # The list of moves is a copy, the caller can reorder it.
+        if self.move_list is None:
+            own, opp = self.bitboards(self.tile)
+            moves = bbToSpaces(self.movesBitboard(self.tile))
+            flips = [bbFlips(own, opp, x * 8 + y) for x, y in moves]
+            reorder = any(SQUARE_ORDER[x * 8 + y] != 1 for x, y in moves)
+            self.move_list = (moves, flips, reorder)
+        moves, flips, reorder = self.move_list
+        return list(moves), [bits.bit_count() for bits in flips], reorder
+
+    def flips(self, x, y):
+        # Bitboard of the pieces the side to move flips moving on [x, y], 0 if it can't move there.
+        if self.move_list is not None:
+            moves, flips, _ = self.move_list
+            for i, move in enumerate(moves):
+                if move == (x, y):
+                    return flips[i]
+            return 0
+        square = x * 8 + y
+        if not isOnBoard(x, y) or (self.black | self.white) >> square & 1:
+            return 0
+        own, opp = self.bitboards(self.tile)
+        return bbFlips(own, opp, square)
+
+    def makeMove(self, x, y, evaluation=None):
+        # The side to move plays on [x, y] and the turn goes to the opponent. Returns the
+        # bitboard of the flipped pieces, 0 (and nothing changes) if the move isn't valid.
+        # <evaluation> is an evaluation of the position (see newEvaluation), updated with the move.
+        flips = self.flips(x, y)
+        if not flips:
+            return 0
+        square = x * 8 + y
+        if evaluation is not None:
+            evaluation.update(self, square, flips)
+        self.history.append((square, flips, self.black_moves, self.white_moves, self.move_list))
+        n_flips = flips.bit_count()
+        if self.tile == BLACK_TILE:
+            self.black |= flips | (1 << square)
+            self.white ^= flips
+            self.black_count += n_flips + 1
+            self.white_count -= n_flips
+            self.tile = WHITE_TILE
+        else:
+            self.white |= flips | (1 << square)
+            self.black ^= flips
+            self.white_count += n_flips + 1
+            self.black_count -= n_flips
+            self.tile = BLACK_TILE
+        self.black_moves = None
+        self.white_moves = None
+        self.move_list = None
+        return flips
+
+    def passTurn(self):
+        # The side to move passes. The pieces don't change, so the moves of each side are kept.
+        self.history.append((None, 0, self.black_moves, self.white_moves, self.move_list))
+        self.tile = opponent(self.tile)
+        self.move_list = None
+
+    def undoMove(self, evaluation=None):
+        # Takes back the last makeMove or passTurn, with the same <evaluation> given to makeMove.
+        square, flips, self.black_moves, self.white_moves, move_list = self.history.pop()
+        self.tile = opponent(self.tile)
+        if square is not None:
+            n_flips = flips.bit_count()
+            if self.tile == BLACK_TILE:
+                self.black ^= flips | (1 << square)
+                self.white |= flips
+                self.black_count -= n_flips + 1
+                self.white_count += n_flips
+            else:
+                self.white ^= flips | (1 << square)
+                self.black |= flips
+                self.white_count -= n_flips + 1
+                self.black_count += n_flips
+            if evaluation is not None:
+                evaluation.undo()
+        self.move_list = move_list
+
+
+def boardToPosition(board, tile):
+    # Position of the list-of-lists <board> with <tile> to move.
+    black, white = boardToBitboards(board, BLACK_TILE)
+    return Position(black, white, tile)
+
+
+def getNewPosition():
+    # The start position of the game, black moves first.
+    board = getNewBoard()
+    resetBoard(board)
+    return boardToPosition(board, BLACK_TILE)
+
+
+def perft(board, tile, depth):
+    # Number of positions <depth> plies after <board> with <tile> to move, going through
+    # the move generator of the search (a Position with its validMoves, makeMove and
+    # undoMove). A pass counts as a ply, and a game that ends before <depth> counts as one
+    # position.
+    return positionPerft(boardToPosition(board, tile), depth)
+
+
+def positionPerft(position, depth):
+    if depth == 0:
+        return 1
+    possible_moves = position.validMoves()[0]
+    if not possible_moves:
+        if not position.canMove(opponent(position.tile)):  # Nobody can move, the game is over
+            return 1
+        position.passTurn()
+        nodes = positionPerft(position, depth - 1)
+        position.undoMove()
+        return nodes
+    if depth == 1:
+        return len(possible_moves)
+    nodes = 0
+    for x, y in possible_moves:
+        position.makeMove(x, y)
+        nodes += positionPerft(position, depth - 1)
+        position.undoMove()
+    return nodes
+
+
+def bbPerft(own, opp, depth):
+    # perft with the bitboard move generator (bbValidMoves and bbFlips) and <own> to move.
+    if depth == 0:
+        return 1
+    moves = bbValidMoves(own, opp)
+    if not moves:
+        if not bbValidMoves(opp, own):
+            return 1
+        return bbPerft(opp, own, depth - 1)
+    if depth == 1:
+        return moves.bit_count()
+    nodes = 0
+    while moves:
+        move = moves & -moves
+        moves ^= move
+        flips = bbFlips(own, opp, move.bit_length() - 1)
+        nodes += bbPerft(opp ^ flips, own | flips | move, depth - 1)
+    return nodes
+
+
+def zobristHash(board, player):
+    # Computes from scratch the Zobrist key of <board> with <player> to move.
+    key = ZOBRIST_WHITE_TO_MOVE if player == WHITE_TILE else 0
+    for x in range(BOARDWIDTH):
+        for y in range(BOARDHEIGHT):
+            if board[x][y] == WHITE_TILE or board[x][y] == BLACK_TILE:
+                key ^= ZOBRIST_PIECES[board[x][y]][x * 8 + y]
+    return key
+
+
+def zobristMove(key, tile, xstart, ystart, flips):
+    # Returns the Zobrist key after <tile> moved on [xstart, ystart] flipping the
+    # pieces of the bitboard <flips> (as returned by Position.makeMove), and the turn
+    # passed. The key before the move doesn't need to be recomputed on undoMove, the
+    # caller just keeps it.
+    key ^= ZOBRIST_PIECES[tile][xstart * 8 + ystart] ^ ZOBRIST_WHITE_TO_MOVE
+    while flips:
+        lowest = flips & -flips
+        key ^= ZOBRIST_FLIP[lowest.bit_length() - 1]
+        flips ^= lowest
+    return key
+
+
+def bbTransform(bits, symmetry):
+    # Returns the bitboard <bits> moved by one of the 8 symmetries of the board (see
+    # symmetricSquare): bit 2 swaps x and y (a transpose of the 8x8 bit matrix), bit 0
+    # mirrors x (reverses the bytes) and bit 1 mirrors y (reverses the bits of each byte).
+    if symmetry & 4:
+        swap = 0x0F0F0F0F00000000 & (bits ^ (bits << 28))
+        bits ^= swap ^ (swap >> 28)
+        swap = 0x3333000033330000 & (bits ^ (bits << 14))
+        bits ^= swap ^ (swap >> 14)
+        swap = 0x5500550055005500 & (bits ^ (bits << 7))
+        bits ^= swap ^ (swap >> 7)
+    if symmetry & 1:
+        bits = int.from_bytes(bits.to_bytes(8, 'little'), 'big')
+    if symmetry & 2:
+        bits = ((bits >> 1) & 0x5555555555555555) | ((bits & 0x5555555555555555) << 1)
+        bits = ((bits >> 2) & 0x3333333333333333) | ((bits & 0x3333333333333333) << 2)
+        bits = ((bits >> 4) & 0x0F0F0F0F0F0F0F0F) | ((bits & 0x0F0F0F0F0F0F0F0F) << 4)
+    return bits
+
+
+def canonicalBitboards(black, white):
+    # Canonical form of the position with the pieces <black> and <white>: of its 8
+    # symmetric versions, the one with the smallest (black, white). Returns its bitboards
+    # and the symmetry that turns the position into it.
+    best = (black, white, 0)
+    for symmetry in range(1, 8):
+        candidate = (bbTransform(black, symmetry), bbTransform(white, symmetry), symmetry)
+        if candidate < best:
+            best = candidate
+    return best
+
+
+def canonicalBoard(board):
+    # Returns a new board with the canonical form of <board> (see canonicalBitboards) and
+    # the symmetry applied: a move [x, y] of <board> is transformMove(symmetry, x, y) in the
+    # canonical board, and a move of the canonical board is untransformMove(symmetry, x, y) here.
+    black, white, symmetry = canonicalBitboards(*boardToBitboards(board, BLACK_TILE))
+    return bitboardsToBoard(black, white, BLACK_TILE), symmetry
+
+
+def transformMove(symmetry, x, y):
+    square = SYMMETRIES[symmetry][x * 8 + y]
+    return [square >> 3, square & 7]
+
+
+def untransformMove(symmetry, x, y):
+    square = SYMMETRIES_INVERSE[symmetry][x * 8 + y]
+    return [square >> 3, square & 7]
+
+
+def canonicalHash(board, player):
+    # Zobrist key of the canonical form of <board> with <player> to move, the same for all
+    # the boards symmetric to <board>, and the symmetry that turns <board> into it. Caches
+    # and files of positions keyed by it keep one entry for all the symmetric positions.
+    black, white, symmetry = canonicalBitboards(*boardToBitboards(board, BLACK_TILE))
+    key = ZOBRIST_WHITE_TO_MOVE if player == WHITE_TILE else 0
+    for tile, bits in ((BLACK_TILE, black), (WHITE_TILE, white)):
+        pieces = ZOBRIST_PIECES[tile]
+        while bits:
+            lowest = bits & -bits
+            key ^= pieces[lowest.bit_length() - 1]
+            bits ^= lowest
+    return key, symmetry
+
+
+def opponent(tile):
+    # Returns the opponent of tile
+    return WHITE_TILE if tile == BLACK_TILE else BLACK_TILE
+
+
+def isCorner(x, y):
+    # Check if a position is in any of the board's corners
+    return IS_CORNER[x * 8 + y]
+
+
+def isEdge(x, y):
+    # Returns true if position [x,y] is on the edge of the board, false otherwise
+    # Except when is a corner, then returns false
+    return IS_EDGE[x * 8 + y]
+
+
+def surroundedBy(board, x, y, player):
+    # Check if a position is surrounded by a lot of pieces of the same colour as <player>
+    # A position is good if it's surrounded by a lot of pieces of the same colour as <player>
+    # but it's also bad if it's surrounded by a lot of pieces owned by the opponent (or empty)
+    value = 0
+    for x_to_check, y_to_check in NEIGHBOURS[x * 8 + y]:
+        if board[x_to_check][y_to_check] == player:
+            value += 5
+        else:
+            value -= 2
+    return value
+
+
+def isC(x, y):
+    # Check if the position [x,y] is a C as marked below
+    #   0 1 2 3 4 5 6 7
+    # 0 . C . . . . C .
+    # 1 C X . . . . X C
+    # 2 . . . . . . . .
+    # 3 . . . . . . . .
+    # 4 . . . . . . . .
+    # 5 . . . . . . . .
+    # 6 C X . . . . X C
+    # 7 . C . . . . C .
+    return IS_C[x * 8 + y]
+
+
+def isX(x, y):
+    # Check if the position [x,y] is an X as marked below
+    #   0 1 2 3 4 5 6 7
+    # 0 . C . . . . C .
+    # 1 C X . . . . X C
+    # 2 . . . . . . . .
+    # 3 . . . . . . . .
+    # 4 . . . . . . . .
+    # 5 . . . . . . . .
+    # 6 C X . . . . X C
+    # 7 . C . . . . C .
+    return IS_X[x * 8 + y]
+
+
+def valueOfOpponentMoves(n_op_moves):
+    # The less moves your opponent can perfom the better for the AI
+    if n_op_moves == 0:
+        return 50
+    elif n_op_moves == 1:
+        return 10
+    elif n_op_moves <= 5:
+        return 10
+    elif n_op_moves <= 10:
+        return -10
+    else:
+        return -50
+
+
+def valueOfPossibleMoves(n_moves):
+    # The more moves you (AI) can perform the better
+    if n_moves == 0:
+        return -50
+    elif n_moves == 1:
+        return -10
+    elif n_moves <= 5:
+        return 10
+    elif n_moves <= 10:
+        return 20
+    else:
+        return 50
+
+
+def reorderMoves(moves_ordered):
+    # Reorder the moves in <moves_ordered> so the it's in the next order: [corners, other_tiles, cs, xs]
+    # It's sorted form most important moves to less important moves
+    buckets = ([], [], [], [])  # corners, others, cs, xs
+    for x, y in moves_ordered:
+        buckets[SQUARE_ORDER[x * 8 + y]].append((x, y))
+    return buckets[0] + buckets[1] + buckets[2] + buckets[3]
+
+
+def cornerAroundBy(board, x, y, player):
+    # Returns true if there is a corner around [x,y] position owned by <player>, otherwise false
+    for x_to_check, y_to_check in ADJACENT_CORNERS[x * 8 + y]:
+        if board[x_to_check][y_to_check] == player:
+            return True
+
+    return False
+
+
+def h(position, computer_tile):
+    # Heuristic value of the Position <position> for the computer. The search uses
+    # evaluateBoard, which gives the same value updating only the spaces changed by each move.
+    board = position.toBoard()
+    h_value = 0
+    h_value += valueOfOpponentMoves(position.movesBitboard(opponent(computer_tile)).bit_count())
+    h_value += valueOfPossibleMoves(position.movesBitboard(computer_tile).bit_count())
+
+    for x in range(BOARDWIDTH):
+        for y in range(BOARDHEIGHT):
+            h_value += surroundedBy(board, x, y, computer_tile)
+            if board[x][y] == computer_tile:
+                h_value += 1
+                if isCorner(x, y):
+                    h_value += 100
+                if isEdge(x, y):
+                    h_value += 20
+                if isC(x, y):
+                    if cornerAroundBy(board, x, y, computer_tile):
+                        h_value += 20
+                    else:
+                        h_value -= 50
+                if isX(x, y):
+                    if cornerAroundBy(board, x, y, computer_tile):
+                        h_value += 20
+                    else:
+                        h_value -= 90
+            elif board[x][y] == opponent(computer_tile):
+                h_value -= 1
+                if isCorner(x, y):
+                    h_value -= 100
+                if isEdge(x, y):
+                    h_value -= 10
+                if isC(x, y):
+                    h_value += 50
+                if isX(x, y):
+                    h_value += 90
+
+    return h_value
+
+
+def squareValue(own, opp, square):
+    # Part of h that belongs to the space <square> (x * 8 + y), with the computer pieces in
+    # the bitboard <own> and the opponent ones in <opp>. Besides the value of its own piece,
+    # it's the surroundedBy points it gives to each of its neighbours: +5 when it's a computer
+    # piece and -2 otherwise. So h is the mobility terms plus the sum of squareValue for all
+    # the spaces.
+    bit = 1 << square
+    if own & bit:
+        if CX_PENALTY[square] and not own & ADJACENT_CORNER_BITS[square]:
+            return OWN_SQUARE_VALUE[square] + CX_PENALTY[square]
+        return OWN_SQUARE_VALUE[square] + (20 if CX_PENALTY[square] else 0)
+    elif opp & bit:
+        return OPPONENT_SQUARE_VALUE[square]
+    return EMPTY_SQUARE_VALUE[square]
+
+
+def positionalValue(position, computer_tile):
+    # The part of h that doesn't depend on the moves, computed for the whole board.
+    own, opp = position.bitboards(computer_tile)
+    value = 0
+    for square in range(64):
+        value += squareValue(own, opp, square)
+    return value
+
+
+class PositionalEvaluation:
+    # The positional part of h (positionalValue) of a Position for <computer_tile>, kept up
+    # to date by Position.makeMove and undoMove: a move only changes the value of the spaces
+    # it touches, the new piece and the flipped ones, and if the new piece is on a corner,
+    # the C and X spaces next to it (they score depending on who has the corner).
+    def __init__(self, position, computer_tile):
+        self.computer_tile = computer_tile
+        self.value = positionalValue(position, computer_tile)
+        self.deltas = []
+
+    def update(self, position, square, flips):
+        # Called by Position.makeMove before the side to move of <position> plays on <square>
+        # flipping the pieces of <flips>.
+        own, opp = position.bitboards(self.computer_tile)
+        if position.tile == self.computer_tile:
+            new_own, new_opp = own | flips | (1 << square), opp ^ flips
+        else:
+            new_own, new_opp = own ^ flips, opp | flips | (1 << square)
+        changed = flips | (1 << square)  # The spaces whose squareValue can change
+        if IS_CORNER[square]:
+            changed |= NEIGHBOUR_BITS[square]
+        delta = 0
+        while changed:
+            lowest = changed & -changed
+            changed_square = lowest.bit_length() - 1
+            delta += squareValue(new_own, new_opp, changed_square) - squareValue(own, opp, changed_square)
+            changed ^= lowest
+        self.value += delta
+        self.deltas.append(delta)
+
+    def undo(self):
+        # Called by Position.undoMove.
+        self.value -= self.deltas.pop()
+
+    def score(self, position):
+        # h of <position>, which must be the one the evaluation follows.
+        return valueOfOpponentMoves(position.movesBitboard(opponent(self.computer_tile)).bit_count()) + \
+            valueOfPossibleMoves(position.movesBitboard(self.computer_tile).bit_count()) + self.value
+
+
+# Pattern evaluation: the board is cut in lines and regions (the patterns) and the value of
+# each one is looked up in a table with an entry for every way of filling its spaces, as a
+# base 3 number with a digit per space: 0 empty, 1 a computer piece and 2 an opponent one.
+# The 8 symmetries of the board give every pattern several instances that share its table.
+# Mobility (the moves of each side) and the side to move have tables of their own. There are
+# tables for each stage of the game, weights are fitted by least squares on the final result
+# of self-play games (see train.py) and they are in PATTERN_FILE, read through mmap.
+PATTERN_SHAPES = [  # name and spaces of each pattern, in the corner of [0, 0]
+    ('edge+2x', [(x, 0) for x in range(8)] + [(1, 1), (6, 1)]),
+    ('corner3x3', [(x, y) for x in range(3) for y in range(3)]),
+    ('row2', [(x, 1) for x in range(8)]),
+    ('row3', [(x, 2) for x in range(8)]),
+    ('row4', [(x, 3) for x in range(8)]),
+    ('diagonal8', [(i, i) for i in range(8)]),
+    ('diagonal7', [(i, i + 1) for i in range(7)]),
+    ('diagonal6', [(i, i + 2) for i in range(6)]),
+    ('diagonal5', [(i, i + 3) for i in range(5)]),
+    ('diagonal4', [(i, i + 4) for i in range(4)]),
+]
+
+
+def patternInstances():
+    # (pattern number, spaces) of every instance: the images of each shape by the symmetries,
+    # once for each different set of spaces.
+    instances = []
+    for pattern, (_, shape) in enumerate(PATTERN_SHAPES):
+        seen = set()
+        for symmetry in range(8):
+            squares = [symmetricSquare(symmetry, x, y) for x, y in shape]
+            if frozenset(squares) not in seen:
+                seen.add(frozenset(squares))
+                instances.append((pattern, squares))
+    return instances
+
+
+PATTERN_INSTANCES = patternInstances()
+PATTERN_OFFSETS = [0]  # where the table of each pattern starts in the weights of a stage
+for _, shape in PATTERN_SHAPES:
+    PATTERN_OFFSETS.append(PATTERN_OFFSETS[-1] + 3 ** len(shape))
+MOBILITY_MOVES = 21  # the moves of each side are counted up to 20 in the mobility table
+MOBILITY_OFFSET = PATTERN_OFFSETS[-1]
+TURN_OFFSET = MOBILITY_OFFSET + MOBILITY_MOVES * MOBILITY_MOVES  # 0 with the computer to move, 1 otherwise
+STAGE_WEIGHTS = TURN_OFFSET + 2
+# SQUARE_PATTERNS[square]: (instance, 3 ** digit of the space) of the instances with <square>
+SQUARE_PATTERNS = [[] for square in range(64)]
+for instance, (_, squares) in enumerate(PATTERN_INSTANCES):
+    for digit, square in enumerate(squares):
+        SQUARE_PATTERNS[square].append((instance, 3 ** digit))
+PATTERN_STAGES = 5
+PATTERN_STAGE_EMPTIES = 12  # empty spaces of each stage, stage 0 is the opening
+PATTERN_SCALE = 16  # a weight of PATTERN_SCALE is worth one piece of final difference
+PATTERN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'patterns.bin')
+
+
+def patternStage(empties):
+    return min((60 - empties) // PATTERN_STAGE_EMPTIES, PATTERN_STAGES - 1)
+
+
+def patternIndices(own, opp):
+    # Index of every instance in the weights of a stage (the offset of its pattern plus its
+    # base 3 number) with the computer pieces in the bitboard <own> and the opponent ones in <opp>.
+    indices = []
+    for pattern, squares in PATTERN_INSTANCES:
+        index = 0
+        for square in reversed(squares):
+            index = 3 * index + (own >> square & 1) + 2 * (opp >> square & 1)
+        indices.append(PATTERN_OFFSETS[pattern] + index)
+    return indices
+
+
+class PatternWeights:
+    # The tables of the pattern evaluation, written by train.py: a header (magic, number of
+    # stages and of weights per stage) and the int16 weights of each stage one after the other.
+    MAGIC = b'OTHPATT1'
+    HEADER = struct.Struct('<8sII')
+
+    def __init__(self, path):
+        with open(path, 'rb') as weights_file:
+            self.data = mmap.mmap(weights_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, stages, size = self.HEADER.unpack_from(self.data, 0)
+        if magic != self.MAGIC or stages != PATTERN_STAGES or size != STAGE_WEIGHTS or \
+                len(self.data) != self.HEADER.size + 2 * stages * size:
+            self.data.close()
+            raise ValueError('%s is not a pattern weights file of this engine' % path)
+        if sys.byteorder == 'little':
+            self.weights = memoryview(self.data)[self.HEADER.size:].cast('h')
+        else:  # The file is little endian, swap a copy
+            self.weights = array('h', self.data[self.HEADER.size:])
+            self.weights.byteswap()
+        # The table of each stage, without copying the weights
+        self.stages = [memoryview(self.weights)[stage * size:(stage + 1) * size] for stage in range(stages)]
+
+    def close(self):
+        for table in self.stages:
+            table.release()
+        if isinstance(self.weights, memoryview):
+            self.weights.release()
+        self.data.close()
+
+
+PATTERN_WEIGHTS = None  # Weights of the pattern evaluation, opened on first use
+PATTERN_WEIGHTS_PATH = PATTERN_FILE
+
+
+def getPatternWeights():
+    # Returns the weights of the pattern evaluation, None if there is no weights file (then
+    # the search evaluates with h).
+    global PATTERN_WEIGHTS
+    if PATTERN_WEIGHTS is None and PATTERN_WEIGHTS_PATH is not None and os.path.exists(PATTERN_WEIGHTS_PATH):
+        PATTERN_WEIGHTS = PatternWeights(PATTERN_WEIGHTS_PATH)
+    return PATTERN_WEIGHTS
+
+
+def setPatternWeights(path):
+    # Makes the search use the pattern weights in <path> from now on, None to evaluate with h.
+    global PATTERN_WEIGHTS, PATTERN_WEIGHTS_PATH
+    if PATTERN_WEIGHTS is not None:
+        PATTERN_WEIGHTS.close()
+    PATTERN_WEIGHTS = None
+    PATTERN_WEIGHTS_PATH = path
+
+
+class PatternEvaluation:
+    # The pattern indices of a Position for <computer_tile>, kept up to date by Position.makeMove
+    # and undoMove like PositionalEvaluation: a move only changes the digits of the new piece
+    # and of the flipped ones, in the instances that have those spaces.
+    def __init__(self, position, computer_tile, weights):
+        self.computer_tile = computer_tile
+        self.stages = weights.stages
+        self.indices = patternIndices(*position.bitboards(computer_tile))
+        self.history = []
+
+    def update(self, position, square, flips):
+        self.history.append(self.indices)
+        indices = self.indices[:]
+        digit = 1 if position.tile == self.computer_tile else 2
+        for instance, power in SQUARE_PATTERNS[square]:
+            indices[instance] += digit * power
+        change = 2 * digit - 3  # A flipped piece goes from the other digit to <digit>
+        while flips:
+            lowest = flips & -flips
+            for instance, power in SQUARE_PATTERNS[lowest.bit_length() - 1]:
+                indices[instance] += change * power
+            flips ^= lowest
+        self.indices = indices
+
+    def undo(self):
+        self.indices = self.history.pop()
+
+    def score(self, position):
+        table = self.stages[patternStage(position.empties())]
+        value = sum(map(table.__getitem__, self.indices))
+        own_moves = min(position.movesBitboard(self.computer_tile).bit_count(), MOBILITY_MOVES - 1)
+        opp_moves = min(position.movesBitboard(opponent(self.computer_tile)).bit_count(), MOBILITY_MOVES - 1)
+        value += table[MOBILITY_OFFSET + own_moves * MOBILITY_MOVES + opp_moves]
+        value += table[TURN_OFFSET + (0 if position.tile == self.computer_tile else 1)]
+        return max(EVAL_MIN, min(EVAL_MAX, value))
+
+
+def newEvaluation(position, computer_tile):
+    # The evaluation the search keeps up to date for <position>: PatternEvaluation when there
+    # are pattern weights, PositionalEvaluation (h) otherwise.
+    weights = getPatternWeights()
+    if weights is None:
+        return PositionalEvaluation(position, computer_tile)
+    return PatternEvaluation(position, computer_tile, weights)
+
+
+def evaluateBoard(position, computer_tile, evaluation=None):
+    # Value of the leaf <position> for the computer: with pattern weights, the sum of their
+    # tables, without them the same value as h(position, computer_tile), without going
+    # through the spaces one by one. <evaluation> is the one of newEvaluation the search keeps
+    # up to date, one is made for <position> if not given. The moves of both sides come from
+    # the Position (only generated if it doesn't have them yet).
+    if evaluation is None:
+        evaluation = newEvaluation(position, computer_tile)
+    return evaluation.score(position)
+
+
+def finalScore(position, computer_tile):
+    # Value for the computer of <position> when neither side can move: the game is over and
+    # the final difference of pieces decides it (see WIN_SCORE).
+    scores = position.scores()
+    difference = scores[computer_tile] - scores[opponent(computer_tile)]
+    if difference > 0:
+        return WIN_SCORE + difference
+    elif difference < 0:
+        return -WIN_SCORE + difference
+    return 0
+
+
+class TranspositionTable:
+    # Fixed-size cache of searched positions indexed by their Zobrist key.
+    # The entries live in flat arrays (15 bytes each), so the table never
+    # grows past the memory budget it was created with. Every bucket has two
+    # slots: the first keeps the deepest search seen for that bucket and the
+    # second one is always replaced with the latest store.
+    ENTRY_BYTES = 8 + 1 + 4 + 1 + 1  # key, depth, score, bound and move
+
+    def __init__(self, size_mb=TT_SIZE_MB):
+        buckets = 1
+        while buckets * 4 * self.ENTRY_BYTES <= size_mb * 1024 * 1024:
+            buckets *= 2  # a power of two so the bucket is just key & mask
+        self.mask = buckets - 1
+        self.size = 2 * buckets
+        self.keys = array('Q', bytes(8 * self.size))
+        self.depths = array('b', [-1]) * self.size  # -1 marks an empty slot
+        self.scores = array('i', bytes(4 * self.size))
+        self.bounds = array('b', bytes(self.size))
+        self.moves = array('b', [-1]) * self.size  # x * 8 + y of the best move, -1 if none
+        self.hits = 0
+        self.misses = 0
+        self.overwrites = 0
+
+    def lookup(self, key):
+        # Returns (depth, score, bound, best_move) stored for <key>, None if it isn't in the table.
+        slot = 2 * (key & self.mask)
+        if self.keys[slot] != key or self.depths[slot] < 0:
+            slot += 1
+            if self.keys[slot] != key or self.depths[slot] < 0:
+                self.misses += 1
+                return None
+        self.hits += 1
+        move = self.moves[slot]
+        return self.depths[slot], self.scores[slot], self.bounds[slot], None if move < 0 else (move >> 3, move & 7)
+
+    def store(self, key, depth, score, bound, best_move):
+        # Saves a search result. It goes to the depth-preferred slot if it is as deep as what
+        # is there (or it is the same position), otherwise to the always-replace slot.
+        slot = 2 * (key & self.mask)
+        if self.depths[slot] >= 0 and self.keys[slot] != key and depth < self.depths[slot]:
+            slot += 1
+        if self.depths[slot] >= 0 and self.keys[slot] != key:
+            self.overwrites += 1
+        self.keys[slot] = key
+        self.depths[slot] = depth
+        self.scores[slot] = score
+        self.bounds[slot] = bound
+        self.moves[slot] = -1 if best_move is None else best_move[0] * 8 + best_move[1]
+
+    def clear(self):
+        # Empties the table, keeping its memory.
+        self.depths = array('b', [-1]) * self.size
+        self.hits = 0
+        self.misses = 0
+        self.overwrites = 0
+
+    def stats(self):
+        # Usage counters to size the table: probes that found the position, probes that
+        # didn't, and stores that evicted a different position.
+        used = self.size - self.depths.count(-1)
+        return {'hits': self.hits, 'misses': self.misses, 'overwrites': self.overwrites,
+                'entries': self.size, 'used': used, 'size_mb': self.size * self.ENTRY_BYTES / (1024 * 1024)}
+
+
+TRANSPOSITION_TABLE = None  # Shared by all the getComputerMove calls, created on first use
+
+
+def getTranspositionTable():
+    # Returns the transposition table of getComputerMove, creating it with TT_SIZE_MB if needed.
+    global TRANSPOSITION_TABLE
+    if TRANSPOSITION_TABLE is None:
+        TRANSPOSITION_TABLE = TranspositionTable(TT_SIZE_MB)
+    return TRANSPOSITION_TABLE
+
+
+def setTranspositionTableSize(size_mb):
+    # Replaces the transposition table of getComputerMove by an empty one of <size_mb> MB.
+    global TRANSPOSITION_TABLE
+    TRANSPOSITION_TABLE = TranspositionTable(size_mb)
+    return TRANSPOSITION_TABLE
+
+
+SEARCH_RANDOM = random.Random()  # Random numbers of the search, seeded from the OS unless setSearchSeed is called
+
+
+def setSearchSeed(seed):
+    # Makes the random move shuffles of the search repeat the same way on every run
+    # with the same <seed>. None goes back to a seed from the OS.
+    SEARCH_RANDOM.seed(seed)
+
+
+class MoveOrdering:
+    # What the search learns about good moves while it runs, to try them first: two killer
+    # moves per ply (the last different moves that made a cut at that distance from the root,
+    # likely to cut again in the sibling positions) and a history table with how much each
+    # space has cut anywhere, weighted by depth * depth. Max and min nodes have separate
+    # tables. It lives as long as a getComputerMove call, so each iteration of the
+    # iterative deepening starts from what the previous ones learned.
+    def __init__(self):
+        self.killers = []  # killers[ply]: [newest, older] killer moves of that ply
+        self.history = [[0] * 64, [0] * 64]  # history[side][x * 8 + y], side 0 is the computer
+
+    def killerMoves(self, ply):
+        while len(self.killers) <= ply:
+            self.killers.append([None, None])
+        return self.killers[ply]
+
+    def cutoff(self, ply, side, move, depth):
+        # <move> made a cut searching to <depth> at <ply>.
+        killers = self.killerMoves(ply)
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self.history[side][move[0] * 8 + move[1]] += depth * depth
+
+    def order(self, possible_moves, number_of_tiles_to_flip, ply, side):
+        # Killer moves first, then by history, then by squares (corners, others, C, X as
+        # reorderMoves), then by the number of tiles flipped and last by the space itself,
+        # so ties are always broken the same way.
+        killers = self.killerMoves(ply)
+        history = self.history[side]
+        keys = []
+        for (x, y), n_flips in zip(possible_moves, number_of_tiles_to_flip):
+            square = x * 8 + y
+            rank = 0 if killers[0] == (x, y) else 1 if killers[1] == (x, y) else 2
+            keys.append((rank, -history[square], SQUARE_ORDER[square], -n_flips, square))
+        keys.sort()
+        return [(square >> 3, square & 7) for _, _, _, _, square in keys]
+
+
+class OpeningBook:
+    # Best moves of the first plies of the game, searched deep offline (see book.py) and
+    # read from a file through mmap, so all the processes using the same book share one
+    # copy of it in the page cache. The file has a header (magic, number of entries, plies
+    # and depth of the book) and the entries sorted by the canonicalHash of their position,
+    # each one with the best move (in the canonical board), the depth searched and the score.
+    MAGIC = b'OTHBOOK1'
+    HEADER = struct.Struct('<8sIBBxx')
+    ENTRY = struct.Struct('<QBBh')  # key, x * 8 + y of the move, depth and score
+
+    def __init__(self, path):
+        with open(path, 'rb') as book_file:
+            self.data = mmap.mmap(book_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.size, self.plies, self.depth = self.HEADER.unpack_from(self.data, 0)
+        if magic != self.MAGIC or len(self.data) != self.HEADER.size + self.size * self.ENTRY.size:
+            self.data.close()
+            raise ValueError('%s is not an opening book' % path)
+
+    def find(self, key):
+        # Returns (move, depth, score) of the entry with <key>, None if there isn't one.
+        low, high = 0, self.size
+        while low < high:  # Binary search for the first entry with a key >= <key>
+            middle = (low + high) // 2
+            if self.ENTRY.unpack_from(self.data, self.HEADER.size + middle * self.ENTRY.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.size:
+            return None
+        entry_key, move, depth, score = self.ENTRY.unpack_from(self.data, self.HEADER.size + low * self.ENTRY.size)
+        if entry_key != key:
+            return None
+        return move, depth, score
+
+    def lookup(self, board, tile):
+        # Returns (best_move, depth, score) of the book for <tile> on <board>, None if it
+        # isn't in the book.
+        pieces = sum(BOARDHEIGHT - column.count(EMPTY_SPACE) for column in board)
+        if pieces > 4 + self.plies:
+            return None
+        key, symmetry = canonicalHash(board, tile)
+        entry = self.find(key)
+        if entry is None:
+            return None
+        move, depth, score = entry
+        best_move = untransformMove(symmetry, move >> 3, move & 7)
+        if not isValidMove(board, tile, best_move[0], best_move[1]):
+            return None  # Another position with the same key
+        return best_move, depth, score
+
+    def close(self):
+        self.data.close()
+
+
+OPENING_BOOK = None  # Opening book of getComputerMove, opened on first use
+OPENING_BOOK_PATH = BOOK_FILE
+
+
+def getOpeningBook():
+    # Returns the opening book of getComputerMove, None if there is no book file.
+    global OPENING_BOOK
+    if OPENING_BOOK is None and OPENING_BOOK_PATH is not None and os.path.exists(OPENING_BOOK_PATH):
+        OPENING_BOOK = OpeningBook(OPENING_BOOK_PATH)
+    return OPENING_BOOK
+
+
+def setOpeningBook(path):
+    # Makes getComputerMove use the book in <path> from now on, None to play without book.
+    global OPENING_BOOK, OPENING_BOOK_PATH
+    if OPENING_BOOK is not None:
+        OPENING_BOOK.close()
+    OPENING_BOOK = None
+    OPENING_BOOK_PATH = path
+
+
+def orderMoves(possible_moves, number_of_tiles_to_flip, reorder, hash_move=None, ordering=None, ply=0, side=0):
+    # Sort the moves by the number of tiles they would flip, the biggest the tiles to flip
+    # are at front. To make it a little random and not to play always the same moves, when a
+    # random number is 0, we shuffle randomly the moves instead on sorting them.
+    # With a MoveOrdering in <ordering> the moves are sorted by it instead, and the random
+    # shuffle is only done at the root (<ply> 0), so the rest of the tree keeps a good order.
+    if ordering is not None:
+        if ply == 0 and SEARCH_RANDOM.randint(0, 100) == 0:
+            SEARCH_RANDOM.shuffle(possible_moves)
+        else:
+            possible_moves = ordering.order(possible_moves, number_of_tiles_to_flip, ply, side)
+        if hash_move in possible_moves:
+            possible_moves.remove(hash_move)
+            possible_moves.insert(0, hash_move)
+        return possible_moves
+    num = SEARCH_RANDOM.randint(0, 100)
+    if num != 0:
+        possible_moves = [move for _, move in sorted(zip(number_of_tiles_to_flip, possible_moves), reverse=True)]
+        if reorder:  # Only if there's any special positions where to move next is necessary to reorder
+            possible_moves = reorderMoves(possible_moves)
+    else:
+        SEARCH_RANDOM.shuffle(possible_moves)
+    if hash_move in possible_moves:  # The best move of a previous search goes first
+        possible_moves.remove(hash_move)
+        possible_moves.insert(0, hash_move)
+    return possible_moves
+
+
+NODES_SEARCHED = 0  # Positions visited by minimax and the endgame solver in this process
+
+
+class SearchStats:
+    # Statistics of the minimax searches it's given to, to see where the time goes and how
+    # good the move ordering is. Collecting them costs a few counters and two clock reads
+    # per node, and minimax doesn't touch anything of them when it gets no SearchStats.
+    def __init__(self):
+        self.nodes_per_ply = []  # nodes_per_ply[i]: nodes visited i plies under the root
+        self.leaf_evaluations = 0  # calls to evaluateBoard
+        self.table_cutoffs = 0  # nodes answered by the transposition table
+        self.beta_cutoffs = 0  # nodes where the search stopped because alfa >= beta
+        self.cutoff_move_index = []  # cutoff_move_index[i]: cuts made by the i-th move tried
+        self.probcut_tries = 0  # nodes where ProbCut ran a shallow search
+        self.probcut_cuts = 0  # nodes ProbCut cut without searching their moves
+        self.lmr_reductions = 0  # moves searched first with LMR_REDUCTION plies less
+        self.lmr_researches = 0  # reduced moves that had to be searched again to the full depth
+        self.evaluation_time = 0.0  # seconds in evaluateBoard
+        self.move_generation_time = 0.0  # seconds in getValidMoves
+        self.pv_table = []  # pv_table[i]: best line found from the last node at ply i
+        self.pv = []  # principal variation of the last finished search
+        self.iterations = []  # one dict per finished search: depth, score, nodes, time and pv
+
+    def enterNode(self, ply):
+        if ply == len(self.nodes_per_ply):
+            self.nodes_per_ply.append(0)
+            self.pv_table.append([])
+        self.nodes_per_ply[ply] += 1
+        self.pv_table[ply] = []
+
+    def updatePv(self, ply, x, y=None):
+        # [x, y] is the new best move at <ply>, followed by the best line found under it.
+        # A pass is updatePv(ply, None), and it's None in the line.
+        move = None if x is None else [x, y]
+        self.pv_table[ply] = [move] + (self.pv_table[ply + 1] if ply + 1 < len(self.pv_table) else [])
+
+    def evaluate(self, position, computer_tile, evaluation):
+        # evaluateBoard counting the call and its time.
+        start = time.perf_counter()
+        value = evaluateBoard(position, computer_tile, evaluation)
+        self.leaf_evaluations += 1
+        self.evaluation_time += time.perf_counter() - start
+        return value
+
+    def cutoff(self, move_index):
+        self.beta_cutoffs += 1
+        while len(self.cutoff_move_index) <= move_index:
+            self.cutoff_move_index.append(0)
+        self.cutoff_move_index[move_index] += 1
+
+    def finishIteration(self, depth, score, nodes, elapsed, pv=None):
+        # Saves the result of a search of <depth> that took <nodes> and <elapsed> seconds. Its
+        # principal variation is <pv> if given, else the one collected by minimax.
+        if pv is None:
+            pv = self.pv_table[0] if self.pv_table else []
+        self.pv = pv
+        self.iterations.append({'depth': depth, 'score': score, 'nodes': nodes, 'time': round(elapsed, 6),
+                                'pv': self.pv})
+
+    def asDict(self):
+        return {'nodes_per_ply': self.nodes_per_ply, 'leaf_evaluations': self.leaf_evaluations,
+                'table_cutoffs': self.table_cutoffs, 'beta_cutoffs': self.beta_cutoffs,
+                'cutoff_move_index': self.cutoff_move_index, 'probcut_tries': self.probcut_tries,
+                'probcut_cuts': self.probcut_cuts, 'lmr_reductions': self.lmr_reductions,
+                'lmr_researches': self.lmr_researches,
+                'evaluation_time': round(self.evaluation_time, 6),
+                'move_generation_time': round(self.move_generation_time, 6),
+                'pv': self.pv, 'iterations': self.iterations}
+
+    def summary(self):
+        # One line with the most useful numbers, to print after each move.
+        nodes = sum(self.nodes_per_ply)
+        first_cuts = self.cutoff_move_index[0] if self.cutoff_move_index else 0
+        return "%d nodes, %d evals, %d tt cuts, %d beta cuts (%.0f%% by the first move), " \
+               "probcut %d/%d (%.0f%%), lmr %d re-searched of %d (%.0f%%), eval %.3f s, movegen %.3f s, pv %s" % (
+                   nodes, self.leaf_evaluations, self.table_cutoffs, self.beta_cutoffs,
+                   100 * first_cuts / self.beta_cutoffs if self.beta_cutoffs else 0,
+                   self.probcut_cuts, self.probcut_tries, 100 * self.probcut_cuts / self.probcut_tries if self.probcut_tries else 0,
+                   self.lmr_researches, self.lmr_reductions,
+                   100 * self.lmr_researches / self.lmr_reductions if self.lmr_reductions else 0,
+                   self.evaluation_time, self.move_generation_time, ' '.join('pass' if move is None else '%d,%d' % tuple(move) for move in self.pv))
+
+
+class SearchTimeout(Exception):
+    # Raised by minimax when the time given to the search (<deadline>) is over.
+    pass
+
+
+class SearchCancelled(Exception):
+    # Raised by minimax when its CancelToken is cancelled. Unlike SearchTimeout, the search
+    # doesn't return the best move found so far, its result isn't wanted any more.
+    pass
+
+
+class CancelToken:
+    # Shared between a search running in a thread and whoever started it, which calls
+    # cancel() to stop it. The search checks it on every node.
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+def minimax(position, depth, alfa, beta, player, computer_tile, table=None, key=0, deadline=None, evaluation=None,
+            stats=None, ply=0, ordering=None, cancel=None):
+    # Value of the Position <position> for computer_tile with <player> (its side to move),
+    # searched <depth> plies. The leaves are scored with evaluateBoard, a side without moves
+    # passes (a pass doesn't count as a ply) and when neither side can move the game is over
+    # and it scores finalScore. Every move is searched, it's the exact value that the selective
+    # search of pvs (ProbCut and late move reductions) approximates.
+    # <table> is an optional TranspositionTable and <key> the Zobrist key of the node,
+    # used to reuse the results of positions already searched to enough depth.
+    # If <deadline> (a time.time() value) is given and passes, SearchTimeout is raised
+    # and <position> is left in the middle of the search, so search on a copy.
+    # <evaluation> is an optional newEvaluation of <position> for computer_tile, so the
+    # leaves don't have to score all the spaces again.
+    # <stats> is an optional SearchStats to collect statistics in, <ply> is the distance
+    # of the node to the root of the search.
+    # <ordering> is an optional MoveOrdering with the killer moves and history of the search.
+    # <cancel> is an optional CancelToken, SearchCancelled is raised as soon as it's cancelled,
+    # also leaving <position> in the middle of the search.
+    global NODES_SEARCHED
+    NODES_SEARCHED += 1
+    if deadline is not None and time.time() > deadline:
+        raise SearchTimeout()
+    if cancel is not None and cancel.cancelled:
+        raise SearchCancelled()
+    if stats is not None:
+        stats.enterNode(ply)
+    if depth == 0:
+        if stats is not None:
+            return stats.evaluate(position, computer_tile, evaluation), None
+        return evaluateBoard(position, computer_tile, evaluation), None
+    if stats is not None:
+        start = time.perf_counter()
+    possible_moves, number_of_tiles_to_flip, reorder = position.validMoves()
+    if stats is not None:
+        stats.move_generation_time += time.perf_counter() - start
+    if not possible_moves:
+        if not position.canMove(opponent(player)):  # Nobody can move, the game is over
+            return finalScore(position, computer_tile), None
+        # <player> passes: the opponent moves on the same board, without using up depth
+        position.passTurn()
+        move_value, _ = minimax(position, depth, alfa, beta, opponent(player), computer_tile, table,
+                                key ^ ZOBRIST_WHITE_TO_MOVE, deadline, evaluation, stats, ply + 1, ordering, cancel)
+        position.undoMove()
+        if stats is not None:
+            stats.updatePv(ply, None)
+        return move_value, None
+
+    hash_move = None
+    if table is not None:
+        entry = table.lookup(key)
+        if entry is not None:
+            entry_depth, entry_score, entry_bound, hash_move = entry
+            if entry_depth >= depth:
+                if entry_bound == EXACT_BOUND or \
+                        (entry_bound == LOWER_BOUND and entry_score >= beta) or \
+                        (entry_bound == UPPER_BOUND and entry_score <= alfa):
+                    if stats is not None:
+                        stats.table_cutoffs += 1
+                    return entry_score, hash_move
+    alfa_start, beta_start = alfa, beta
+    side = 0 if player == computer_tile else 1
+    possible_moves = orderMoves(possible_moves, number_of_tiles_to_flip, reorder, hash_move, ordering, ply, side)
+
+    if player == computer_tile:  # IA turn
+        best_move = possible_moves[0]
+        for i, (x, y) in enumerate(possible_moves):
+            flipped = position.makeMove(x, y, evaluation)
+            child_key = zobristMove(key, player, x, y, flipped) if table is not None else 0
+            move_value, _ = minimax(position, depth - 1, alfa, beta, opponent(player), computer_tile, table, child_key,
+                                    deadline, evaluation, stats, ply + 1, ordering, cancel)
+            position.undoMove(evaluation)
+            if move_value > alfa:
+                alfa = move_value
+                best_move = [x, y]
+                if stats is not None:
+                    stats.updatePv(ply, x, y)
+
+            if alfa >= beta:
+                if stats is not None:
+                    stats.cutoff(i)
+                if ordering is not None:
+                    ordering.cutoff(ply, side, (x, y), depth)
+                break  # Tall beta
+
+        if table is not None:
+            bound = LOWER_BOUND if alfa >= beta else UPPER_BOUND if alfa <= alfa_start else EXACT_BOUND
+            table.store(key, depth, alfa, bound, best_move)
+        return alfa, best_move
+    else:  # Human player turn
+        best_move = possible_moves[0]
+        for i, (x, y) in enumerate(possible_moves):
+            flipped = position.makeMove(x, y, evaluation)
+            child_key = zobristMove(key, player, x, y, flipped) if table is not None else 0
+            move_value, _ = minimax(position, depth - 1, alfa, beta, opponent(player), computer_tile, table, child_key,
+                                    deadline, evaluation, stats, ply + 1, ordering, cancel)
+            position.undoMove(evaluation)
+            if move_value < beta:
+                beta = move_value
+                best_move = [x, y]
+                if stats is not None:
+                    stats.updatePv(ply, x, y)
+            if alfa >= beta:
+                if stats is not None:
+                    stats.cutoff(i)
+                if ordering is not None:
+                    ordering.cutoff(ply, side, (x, y), depth)
+                break  # Tall alfa
+
+        if table is not None:
+            bound = UPPER_BOUND if alfa >= beta else LOWER_BOUND if beta >= beta_start else EXACT_BOUND
+            table.store(key, depth, beta, bound, best_move)
+        return beta, best_move
+
+
+BATCH_EVALUATOR = None  # batcheval.evaluateChildren when pvs scores the leaves of a node in one call
+
+
+def setBatchEvaluation(enabled):
+    # Makes pvs evaluate all the children of the nodes just above the leaves at once with
+    # NumPy (batcheval), instead of making each move and evaluating it. Needs NumPy.
+    global BATCH_EVALUATOR
+    if enabled:
+        import batcheval  # Imported here, NumPy takes longer to import than the whole engine
+        BATCH_EVALUATOR = batcheval.evaluateChildren
+    else:
+        BATCH_EVALUATOR = None
+
+
+# ProbCut: the value of a deep search of a position is close to a linear function of the
+# value of a shallow search of it, v_deep = a * v_shallow + b, with errors of deviation sigma.
+# So before searching a node to <depth>, a null window search to the shallow depth tells if
+# the deep value is very likely (PROBCUT_THRESHOLD sigmas) outside the window, and the node
+# is cut without searching its moves. The parameters depend on the depth and on the stage of
+# the game (the number of empty spaces, as in Multi-ProbCut), and are fitted from self-play
+# positions with
+#   python othello.py probcut --games selfplay.jsonl
+# They are scores of pvs, for the side to move, with the pattern evaluation of PATTERN_FILE
+# (fit them again after training it), so without pattern weights there is no ProbCut. Deeper
+# searches than the ones fitted use the parameters of the deepest one.
+PROBCUT_MIN_DEPTH = 3
+PROBCUT_STAGE_EMPTIES = 15  # empty spaces of each stage, stage 0 is the opening
+PROBCUT_PARAMETERS = {  # (stage, depth): (a, b, sigma)
+    (0, 3): (0.721, 13.1, 41.0),  # 190 samples
+    (0, 4): (0.746, -12.3, 37.5),  # 188 samples
+    (0, 5): (0.593, 83.6, 41.8),  # 188 samples
+    (0, 6): (0.576, -85.7, 41.2),  # 188 samples
+    (0, 7): (0.553, 35.8, 33.7),  # 188 samples
+    (1, 3): (0.770, 20.3, 62.6),  # 166 samples
+    (1, 4): (0.836, -21.2, 69.5),  # 166 samples
+    (1, 5): (0.759, 132.2, 86.4),  # 166 samples
+    (1, 6): (0.839, -135.0, 78.2),  # 166 samples
+    (1, 7): (0.834, 21.9, 87.6),  # 166 samples
+    (2, 3): (0.979, -10.1, 103.8),  # 208 samples
+    (2, 4): (1.022, 10.3, 86.1),  # 208 samples
+    (2, 5): (1.033, 114.1, 107.6),  # 208 samples
+    (2, 6): (1.093, -114.1, 93.3),  # 208 samples
+    (2, 7): (1.087, -28.2, 96.5),  # 208 samples
+    (3, 3): (1.005, 8.6, 174.2),  # 36 samples
+    (3, 4): (1.046, 31.8, 86.9),  # 36 samples
+    (3, 5): (1.062, 81.3, 101.5),  # 36 samples
+    (3, 6): (1.086, -22.4, 79.1),  # 36 samples
+    (3, 7): (1.111, -12.8, 77.6),  # 36 samples
+}
+
+
+def probCutShallowDepth(depth):
+    # Depth of the shallow search of ProbCut for a node of <depth>.
+    return depth // 2
+
+
+def probCutStage(empties):
+    return (60 - empties) // PROBCUT_STAGE_EMPTIES
+
+
+def probCutParameters(depth, empties):
+    # (a, b, sigma) of ProbCut for a node of <depth> with <empties> empty spaces, None if
+    # there aren't any for its stage or the search evaluates with h.
+    if PATTERN_WEIGHTS is None:
+        return None
+    stage = probCutStage(empties)
+    fitted = [fitted_depth for fitted_stage, fitted_depth in PROBCUT_PARAMETERS if fitted_stage == stage]
+    if not fitted or depth < min(fitted):
+        return None
+    return PROBCUT_PARAMETERS[(stage, min(depth, max(fitted)))]
+
+
+def probCut(position, depth, alfa, beta, player, computer_tile, table, key, deadline, evaluation, stats, ply, ordering,
+            cancel):
+    # The ProbCut test of a pvs node: returns <beta> when the shallow search says that the
+    # node fails high, <alfa> when it says that it fails low, and None when it has to be searched.
+    parameters = probCutParameters(depth, position.empties())
+    if parameters is None:
+        return None
+    a, b, sigma = parameters
+    shallow = probCutShallowDepth(depth)
+    if stats is not None:
+        stats.probcut_tries += 1
+    margin = PROBCUT_THRESHOLD * sigma
+    bound = math.ceil((beta + margin - b) / a)  # Shallow value that predicts a deep one >= beta
+    if beta < WIN_SCORE and bound < WIN_SCORE:
+        if pvs(position, shallow, bound - 1, bound, player, computer_tile, table, key, deadline, evaluation, stats, ply,
+               ordering, cancel)[0] >= bound:
+            if stats is not None:
+                stats.probcut_cuts += 1
+            return beta
+    bound = math.floor((alfa - margin - b) / a)  # Shallow value that predicts a deep one <= alfa
+    if alfa > -WIN_SCORE and bound > -WIN_SCORE:
+        if pvs(position, shallow, bound, bound + 1, player, computer_tile, table, key, deadline, evaluation, stats, ply,
+               ordering, cancel)[0] <= bound:
+            if stats is not None:
+                stats.probcut_cuts += 1
+            return alfa
+    return None
+
+
+def pvs(position, depth, alfa, beta, player, computer_tile, table=None, key=0, deadline=None, evaluation=None,
+        stats=None, ply=0, ordering=None, cancel=None):
+    # Principal variation search: minimax in negamax form, so the score is always for
+    # <player> (evaluateBoard of computer_tile with the sign changed on the opponent's turns),
+    # with the same moves as minimax. Only the first move gets the whole ]alfa, beta[ window, the rest
+    # are searched with a null window ]alfa, alfa + 1[ that only tells if they are better than
+    # the best so far, and if one is, it's searched again with the whole window. With a good
+    # move ordering the first move is usually the best and most moves are proven worse cheaply.
+    # The arguments are the ones of minimax, and the transposition table entries are also
+    # scores for the player to move, so don't share a table between minimax and pvs.
+    # It's also a selective search, which gives up some exactness for depth: below the root,
+    # nodes that ProbCut expects outside the window are cut (see PROBCUT_PARAMETERS), and the
+    # moves after the first LMR_MIN_MOVE (except corners) are searched LMR_REDUCTION plies
+    # less, and again to the full depth only if they turn out better than the best so far.
+    global NODES_SEARCHED
+    NODES_SEARCHED += 1
+    if deadline is not None and time.time() > deadline:
+        raise SearchTimeout()
+    if cancel is not None and cancel.cancelled:
+        raise SearchCancelled()
+    if stats is not None:
+        stats.enterNode(ply)
+    sign = 1 if player == computer_tile else -1
+    if depth == 0:
+        if stats is not None:
+            return sign * stats.evaluate(position, computer_tile, evaluation), None
+        return sign * evaluateBoard(position, computer_tile, evaluation), None
+    if stats is not None:
+        start = time.perf_counter()
+    possible_moves, number_of_tiles_to_flip, reorder = position.validMoves()
+    if stats is not None:
+        stats.move_generation_time += time.perf_counter() - start
+    if not possible_moves:
+        if not position.canMove(opponent(player)):  # Nobody can move, the game is over
+            return sign * finalScore(position, computer_tile), None
+        # <player> passes: the opponent moves on the same board, without using up depth
+        position.passTurn()
+        move_value = -pvs(position, depth, -beta, -alfa, opponent(player), computer_tile, table,
+                          key ^ ZOBRIST_WHITE_TO_MOVE, deadline, evaluation, stats, ply + 1, ordering, cancel)[0]
+        position.undoMove()
+        if stats is not None:
+            stats.updatePv(ply, None)
+        return move_value, None
+
+    hash_move = None
+    if table is not None:
+        entry = table.lookup(key)
+        if entry is not None:
+            entry_depth, entry_score, entry_bound, hash_move = entry
+            if entry_depth >= depth:
+                if entry_bound == EXACT_BOUND or \
+                        (entry_bound == LOWER_BOUND and entry_score >= beta) or \
+                        (entry_bound == UPPER_BOUND and entry_score <= alfa):
+                    if stats is not None:
+                        stats.table_cutoffs += 1
+                    return entry_score, hash_move
+    if PROBCUT_THRESHOLD is not None and ply > 0 and depth >= PROBCUT_MIN_DEPTH:
+        cut = probCut(position, depth, alfa, beta, player, computer_tile, table, key, deadline, evaluation, stats, ply,
+                      ordering, cancel)
+        if cut is not None:
+            return cut, hash_move
+    alfa_start = alfa
+    side = 0 if player == computer_tile else 1
+    possible_moves = orderMoves(possible_moves, number_of_tiles_to_flip, reorder, hash_move, ordering, ply, side)
+
+    best_move = possible_moves[0]
+    best = -SCORE_BOUND
+    if depth == 1 and BATCH_EVALUATOR is not None:
+        return batchLeaves(position, alfa, beta, player, computer_tile, possible_moves, table, key,
+                           stats, ply, ordering, side)
+    reduce_late_moves = LMR_REDUCTION and ply > 0 and depth >= LMR_MIN_DEPTH
+    for i, (x, y) in enumerate(possible_moves):
+        flipped = position.makeMove(x, y, evaluation)
+        child_key = zobristMove(key, player, x, y, flipped) if table is not None else 0
+        if i == 0:
+            move_value = -pvs(position, depth - 1, -beta, -alfa, opponent(player), computer_tile, table, child_key,
+                              deadline, evaluation, stats, ply + 1, ordering, cancel)[0]
+        else:
+            if reduce_late_moves and i >= LMR_MIN_MOVE and not IS_CORNER[x * 8 + y]:
+                move_value = -pvs(position, max(depth - 1 - LMR_REDUCTION, 1), -alfa - 1, -alfa, opponent(player),
+                                  computer_tile, table, child_key, deadline, evaluation, stats, ply + 1, ordering,
+                                  cancel)[0]
+                if stats is not None:
+                    stats.lmr_reductions += 1
+                if move_value > alfa:  # Not as bad as expected, search it to the full depth
+                    if stats is not None:
+                        stats.lmr_researches += 1
+                    move_value = -pvs(position, depth - 1, -alfa - 1, -alfa, opponent(player), computer_tile, table,
+                                      child_key, deadline, evaluation, stats, ply + 1, ordering, cancel)[0]
+            else:
+                move_value = -pvs(position, depth - 1, -alfa - 1, -alfa, opponent(player), computer_tile, table,
+                                  child_key, deadline, evaluation, stats, ply + 1, ordering, cancel)[0]
+            if alfa < move_value < beta:  # Better than the first move, find out by how much
+                move_value = -pvs(position, depth - 1, -beta, -alfa, opponent(player), computer_tile, table, child_key,
+                                  deadline, evaluation, stats, ply + 1, ordering, cancel)[0]
+        position.undoMove(evaluation)
+        if move_value > best:
+            best = move_value
+            if move_value > alfa:
+                alfa = move_value
+                best_move = [x, y]
+                if stats is not None:
+                    stats.updatePv(ply, x, y)
+
+                if alfa >= beta:
+                    if stats is not None:
+                        stats.cutoff(i)
+                    if ordering is not None:
+                        ordering.cutoff(ply, side, (x, y), depth)
+                    break  # Tall beta
+
+    if table is not None:
+        bound = LOWER_BOUND if best >= beta else UPPER_BOUND if best <= alfa_start else EXACT_BOUND
+        table.store(key, depth, best, bound, best_move)
+    return best, best_move
+
+
+def batchLeaves(position, alfa, beta, player, computer_tile, possible_moves, table, key, stats, ply, ordering, side):
+    # The loop over the moves of pvs at depth 1, with all the children evaluated in one call
+    # to BATCH_EVALUATOR. It keeps the same values, cuts and table entries as the loop of pvs:
+    # at depth 0 the windows don't change the values, so the null windows aren't needed.
+    global NODES_SEARCHED
+    sign = 1 if player == computer_tile else -1
+    if stats is not None:
+        start = time.perf_counter()
+    values = BATCH_EVALUATOR(position, computer_tile, possible_moves, player)
+    if stats is not None:
+        stats.evaluation_time += time.perf_counter() - start
+    alfa_start = alfa
+    best_move = possible_moves[0]
+    best = -SCORE_BOUND
+    for i, (x, y) in enumerate(possible_moves):
+        NODES_SEARCHED += 1
+        if stats is not None:
+            stats.enterNode(ply + 1)
+            stats.leaf_evaluations += 1
+        move_value = sign * int(values[i])
+        if move_value > best:
+            best = move_value
+            if move_value > alfa:
+                alfa = move_value
+                best_move = [x, y]
+                if stats is not None:
+                    stats.updatePv(ply, x, y)
+
+                if alfa >= beta:
+                    if stats is not None:
+                        stats.cutoff(i)
+                    if ordering is not None:
+                        ordering.cutoff(ply, side, (x, y), 1)
+                    break  # Tall beta
+
+    if table is not None:
+        bound = LOWER_BOUND if best >= beta else UPPER_BOUND if best <= alfa_start else EXACT_BOUND
+        table.store(key, 1, best, bound, best_move)
+    return best, best_move
+
+
+def aspirationSearch(position, depth, computer_tile, previous_score=None, table=None, key=0, deadline=None,
+                     evaluation=None, stats=None, ordering=None, cancel=None):
+    # pvs from the root (the computer's turn) with a window of ASPIRATION_WINDOW around
+    # <previous_score>, the score of the previous iteration of the iterative deepening: a
+    # narrow window cuts more, and the score doesn't change much from one depth to the next.
+    # If the score falls outside, the search is repeated with the window twice as wide on
+    # that side, until it's inside.
+    if previous_score is None:
+        return pvs(position, depth, -SCORE_BOUND, SCORE_BOUND, computer_tile, computer_tile, table, key, deadline,
+                   evaluation, stats, 0, ordering, cancel)
+    width = ASPIRATION_WINDOW
+    alfa = max(previous_score - width, -SCORE_BOUND)
+    beta = min(previous_score + width, SCORE_BOUND)
+    while True:
+        score, best_move = pvs(position, depth, alfa, beta, computer_tile, computer_tile, table, key, deadline,
+                               evaluation, stats, 0, ordering, cancel)
+        width *= 2
+        if score <= alfa and alfa > -SCORE_BOUND:
+            alfa = max(score - width, -SCORE_BOUND)
+        elif score >= beta and beta < SCORE_BOUND:
+            beta = min(score + width, SCORE_BOUND)
+        else:
+            return score, best_move
+
+
+def searchChild(position, computer_tile, x, y, depth, alfa, beta, key=None, deadline=None):
+    # Worker side of parallelMinimax: plays the computer's move [x, y] on <position> (a copy
+    # sent to the worker process) and searches the resulting position. With a <key>, the
+    # search uses the transposition table of the worker process.
+    flipped = position.makeMove(x, y)
+    if key is None:
+        table = None
+        child_key = 0
+    else:
+        table = getTranspositionTable()
+        child_key = zobristMove(key, computer_tile, x, y, flipped)
+    move_value, _ = pvs(position, depth - 1, -beta, -alfa, opponent(computer_tile), computer_tile, table, child_key, deadline,
+                        newEvaluation(position, computer_tile), None, 1, MoveOrdering())
+    return -move_value
+
+
+def parallelMinimax(position, depth, alfa, beta, computer_tile, executor, workers, table=None, key=0, deadline=None):
+    # Root of minimax (the computer's turn) with the root moves spread over the
+    # processes of <executor>. Following "Young Brothers Wait", the first move is
+    # searched here to get a good alfa, then the rest go to the workers, at most
+    # <workers> at a time, each one with the best alfa known when it's sent.
+    # Without selective search (PROBCUT_THRESHOLD None and LMR_REDUCTION 0) it returns
+    # the same move as pvs at the same depth: every move ends with a value of at least
+    # the alfa it was given, which comes from moves before it, so the first move reaching
+    # the maximum is the one pvs keeps. With it, what ProbCut cuts depends on the windows,
+    # which aren't the ones of pvs, so the move can differ.
+    import concurrent.futures  # Imported here, it takes longer to import than the whole engine
+    possible_moves, number_of_tiles_to_flip, reorder = position.validMoves()
+    if not possible_moves or depth == 0:
+        return pvs(position, depth, alfa, beta, computer_tile, computer_tile, table, key, deadline)
+
+    hash_move = None
+    if table is not None:
+        entry = table.lookup(key)
+        if entry is not None:
+            hash_move = entry[3]
+    alfa_start = alfa
+    possible_moves = orderMoves(possible_moves, number_of_tiles_to_flip, reorder, hash_move)
+    best_move = possible_moves[0]
+
+    child_key = key if table is not None else None
+    values = [None] * len(possible_moves)
+    x, y = possible_moves[0]
+    values[0] = searchChild(position.copy(), computer_tile, x, y, depth, alfa, beta, child_key, deadline)
+    alfa = max(alfa, values[0])
+    running = {}
+    next_move = 1
+    try:
+        while next_move < len(possible_moves) or running:
+            # After a beta cut no more moves are sent, but the ones running are waited
+            # for, a move before the one that cut could also cut and minimax would keep it.
+            while next_move < len(possible_moves) and len(running) < workers and alfa < beta:
+                x, y = possible_moves[next_move]
+                future = executor.submit(searchChild, position, computer_tile, x, y, depth, alfa, beta, child_key, deadline)
+                running[future] = next_move
+                next_move += 1
+            if not running:
+                break
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                i = running.pop(future)
+                values[i] = future.result()
+                alfa = max(alfa, values[i])
+    finally:
+        for future in running:
+            future.cancel()
+
+    alfa = alfa_start
+    for i, move_value in enumerate(values):
+        if move_value is not None and move_value > alfa:
+            alfa = move_value
+            best_move = list(possible_moves[i])
+            if alfa >= beta:
+                break
+    if table is not None:
+        bound = LOWER_BOUND if alfa >= beta else UPPER_BOUND if alfa <= alfa_start else EXACT_BOUND
+        table.store(key, depth, alfa, bound, best_move)
+    return alfa, best_move
+
+
+SEARCH_POOL = None  # Worker processes of the parallel search, created on first use
+SEARCH_POOL_WORKERS = 0
+
+
+def getSearchPool(workers):
+    # Returns a process pool with <workers> processes for parallelMinimax, kept between calls.
+    global SEARCH_POOL, SEARCH_POOL_WORKERS
+    import concurrent.futures
+    if SEARCH_POOL is None or SEARCH_POOL_WORKERS != workers:
+        if SEARCH_POOL is not None:
+            SEARCH_POOL.shutdown()
+        SEARCH_POOL = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        SEARCH_POOL_WORKERS = workers
+        atexit.register(SEARCH_POOL.shutdown)
+    return SEARCH_POOL
+
+
+def finalDifference(own, opp):
+    # Final score of the game from the point of view of the owner of <own>, the number
+    # of pieces of each colour as in getScoreOfBoard.
+    return own.bit_count() - opp.bit_count()
+
+
+def lastEmpty1(own, opp, square):
+    # Exact final difference with only the space <square> empty and <own> to move. The
+    # move flips are counted directly: each flipped piece adds 2 to the difference.
+    flips = bbFlips(own, opp, square)
+    if flips:
+        return own.bit_count() - opp.bit_count() + 2 * flips.bit_count() + 1
+    flips = bbFlips(opp, own, square)  # <own> passes
+    if flips:
+        return own.bit_count() - opp.bit_count() - 2 * flips.bit_count() - 1
+    return own.bit_count() - opp.bit_count()
+
+
+def lastEmpties2(own, opp, a, b, alfa, beta):
+    # Exact final difference with the spaces <a> and <b> empty and <own> to move.
+    best = -65
+    flips = bbFlips(own, opp, a)
+    if flips:
+        best = -lastEmpty1(opp ^ flips, own | flips | (1 << a), b)
+    if best < beta:
+        flips = bbFlips(own, opp, b)
+        if flips:
+            best = max(best, -lastEmpty1(opp ^ flips, own | flips | (1 << b), a))
+    if best > -65:
+        return best
+    if bbFlips(opp, own, a) or bbFlips(opp, own, b):  # <own> passes
+        return -lastEmpties2(opp, own, a, b, -beta, -alfa)
+    return finalDifference(own, opp)
+
+
+def lastEmpties3(own, opp, a, b, c, alfa, beta):
+    # Exact final difference with the spaces <a>, <b> and <c> empty (in the order they
+    # should be tried) and <own> to move.
+    best = -65
+    for square, rest1, rest2 in ((a, b, c), (b, a, c), (c, a, b)):
+        flips = bbFlips(own, opp, square)
+        if flips:
+            value = -lastEmpties2(opp ^ flips, own | flips | (1 << square), rest1, rest2, -beta, -max(alfa, best))
+            if value > best:
+                best = value
+                if best >= beta:
+                    return best
+    if best > -65:
+        return best
+    if bbFlips(opp, own, a) or bbFlips(opp, own, b) or bbFlips(opp, own, c):  # <own> passes
+        return -lastEmpties3(opp, own, a, b, c, -beta, -alfa)
+    return finalDifference(own, opp)
+
+
+def orderEndgameMoves(own, opp, moves, empty, n_empties):
+    # Returns the (square, flips) pairs of the moves in <moves>, in the order the endgame
+    # solver tries them: first the moves leaving the opponent less replies (fastest first)
+    # when there are enough empty spaces to pay for it, and then the moves in quadrants with
+    # an odd number of empty spaces, so we are more likely to get the last move of each region.
+    odd = 0
+    for quadrant in QUADRANT_MASKS:
+        if (empty & quadrant).bit_count() & 1:
+            odd |= quadrant
+    ordered = []
+    while moves:
+        move = moves & -moves
+        moves ^= move
+        square = move.bit_length() - 1
+        flips = bbFlips(own, opp, square)
+        order = 0 if move & odd else 1
+        if n_empties > 6:
+            order += 2 * bbValidMoves(opp ^ flips, own | flips | move).bit_count()
+        ordered.append((order, square, flips))
+    ordered.sort()
+    return [(square, flips) for _, square, flips in ordered]
+
+
+def endgameSearch(own, opp, alfa, beta, deadline=None, cancel=None):
+    # Negamax with alfa-beta to the end of the game with <own> to move, returns the exact
+    # final difference of pieces for <own> (or a bound of it outside ]alfa, beta[).
+    global NODES_SEARCHED
+    NODES_SEARCHED += 1
+    if deadline is not None and time.time() > deadline:
+        raise SearchTimeout()
+    if cancel is not None and cancel.cancelled:
+        raise SearchCancelled()
+    empty = ~(own | opp) & FULL_MASK
+    n_empties = empty.bit_count()
+    if n_empties <= 3:
+        if n_empties == 0:
+            return finalDifference(own, opp)
+        odd = 0
+        for quadrant in QUADRANT_MASKS:
+            if (empty & quadrant).bit_count() & 1:
+                odd |= quadrant
+        squares = [square for _, square in sorted((0 if (1 << square) & odd else 1, square)
+                                                  for square in range(64) if (empty >> square) & 1)]
+        if n_empties == 1:
+            return lastEmpty1(own, opp, squares[0])
+        if n_empties == 2:
+            return lastEmpties2(own, opp, squares[0], squares[1], alfa, beta)
+        return lastEmpties3(own, opp, squares[0], squares[1], squares[2], alfa, beta)
+
+    moves = bbValidMoves(own, opp)
+    if not moves:
+        if not bbValidMoves(opp, own):  # Nobody can move, the game is over
+            return finalDifference(own, opp)
+        return -endgameSearch(opp, own, -beta, -alfa, deadline, cancel)  # <own> passes
+
+    best = -65
+    for square, flips in orderEndgameMoves(own, opp, moves, empty, n_empties):
+        value = -endgameSearch(opp ^ flips, own | flips | (1 << square), -beta, -alfa, deadline, cancel)
+        if value > best:
+            best = value
+            if value > alfa:
+                alfa = value
+                if alfa >= beta:
+                    break
+    return best
+
+
+def solveEndgame(board, tile, deadline=None, cancel=None):
+    # Plays the rest of the game perfectly from <board> with <tile> to move, passing when a
+    # side has no moves. Returns the final difference of pieces for <tile> if both sides
+    # play perfectly (positive is a win) and the move to get it, None if <tile> can't move.
+    own, opp = boardToBitboards(board, tile)
+    moves = bbValidMoves(own, opp)
+    if not moves:
+        return endgameSearch(own, opp, -65, 65, deadline, cancel), None
+    empty = ~(own | opp) & FULL_MASK
+    alfa = -65
+    best_move = None
+    for square, flips in orderEndgameMoves(own, opp, moves, empty, empty.bit_count()):
+        value = -endgameSearch(opp ^ flips, own | flips | (1 << square), -65, -alfa, deadline, cancel)
+        if value > alfa:
+            alfa = value
+            best_move = [square >> 3, square & 7]
+    return alfa, best_move
+
+
+def endgameOutcome(difference):
+    # Name of the result of a game finished with <difference> pieces for the player.
+    if difference > 0:
+        return 'win'
+    elif difference < 0:
+        return 'loss'
+    return 'draw'
+
+
+def getComputerMove(board, computer_tile, time_limit=None, max_depth=AI_MAX_DEPTH, workers=1, info=None, stats=None,
+                    cancel=None):
+    # The transposition table is kept between calls, so the positions searched on the
+    # previous turns that can still be reached are not searched again.
+    # Without <time_limit> it searches straight to <max_depth>. With a <time_limit> in
+    # seconds it deepens one ply at a time, each iteration trying first the best move of
+    # the previous one (through the transposition table) in an aspiration window around
+    # its score, and returns the best move of the deepest search that finished in time.
+    # With more than one worker the root moves are searched in parallel processes.
+    # With ENDGAME_EMPTIES empty spaces or less the game is solved to the end instead, and
+    # with a <time_limit> the solver only gets ENDGAME_TIME_SHARE of it: if it doesn't finish,
+    # the usual search has the rest of the time.
+    # If <info> is a dict, it gets the score of the move, the depth searched and, when
+    # the endgame was solved, the proven 'outcome' ('win', 'loss' or 'draw') for the computer,
+    # and the 'nodes' searched (only the ones of this process with parallel workers).
+    # A SearchStats in <stats> collects the statistics of the search, with one iteration per
+    # depth searched, and they are also put in <info> as a dict under 'stats'. With parallel
+    # workers it only sees the root of the search.
+    # Positions in the opening book are not searched, <info> gets 'book' True for them.
+    # If the CancelToken <cancel> is cancelled, SearchCancelled is raised (see BackgroundSearch).
+    # The search plays on a Position made from <board>, <board> itself is never changed.
+    start = time.time()
+    deadline = None if time_limit is None else start + time_limit
+    start_nodes = NODES_SEARCHED
+    book = getOpeningBook()
+    if book is not None:
+        entry = book.lookup(board, computer_tile)
+        if entry is not None:
+            best_move, depth, score = entry
+            if stats is not None:
+                stats.finishIteration(depth, score, 0, time.time() - start, [best_move])
+            if info is not None:
+                info.update(score=score, depth=depth, outcome=None, nodes=0, book=True)
+                if stats is not None:
+                    info['stats'] = stats.asDict()
+            return best_move
+    empties = sum(column.count(EMPTY_SPACE) for column in board)
+    if empties <= ENDGAME_EMPTIES:
+        try:
+            solver_deadline = None if time_limit is None else start + time_limit * ENDGAME_TIME_SHARE
+            score, best_move = solveEndgame(board, computer_tile, solver_deadline, cancel)
+        except SearchTimeout:
+            pass  # Not solved in time, play the best move found by the search in the time left
+        else:
+            if stats is not None:
+                stats.finishIteration(empties, score, NODES_SEARCHED - start_nodes, time.time() - start,
+                                      [] if best_move is None else [best_move])
+            if info is not None:
+                info.update(score=score, depth=empties, outcome=endgameOutcome(score), nodes=NODES_SEARCHED - start_nodes,
+                            book=False)
+                if stats is not None:
+                    info['stats'] = stats.asDict()
+            return best_move
+
+    table = getTranspositionTable()
+    key = zobristHash(board, computer_tile)
+    if computer_tile == WHITE_TILE:
+        key ^= ZOBRIST_WHITE_COMPUTER
+    ordering = MoveOrdering()
+
+    position = boardToPosition(board, computer_tile)
+    evaluation = newEvaluation(position, computer_tile)
+
+    def search(depth, deadline=None, previous_score=None):
+        iteration_start = time.time()
+        iteration_nodes = NODES_SEARCHED
+        if workers > 1:
+            score, best_move = parallelMinimax(position, depth, -SCORE_BOUND, SCORE_BOUND, computer_tile,
+                                               getSearchPool(workers), workers, table, key, deadline)
+        else:
+            score, best_move = aspirationSearch(position, depth, computer_tile, previous_score, table, key, deadline,
+                                                evaluation, stats, ordering, cancel)
+        if stats is not None:
+            pv = stats.pv_table[0] if workers == 1 and stats.pv_table else []
+            if not pv and best_move is not None:  # Parallel search or root found in the transposition table
+                pv = [best_move]
+            stats.finishIteration(depth, score, NODES_SEARCHED - iteration_nodes, time.time() - iteration_start, pv)
+        return score, best_move
+
+    if deadline is None:
+        score, best_move = search(max_depth)
+        searched_depth = max_depth
+    else:
+        score, best_move = search(1)
+        searched_depth = 1
+        for depth in range(2, max_depth + 1):
+            try:
+                score, best_move = search(depth, deadline, score)
+            except SearchTimeout:
+                break  # The position is left in the middle of the search, but it isn't used again
+            searched_depth = depth
+    if info is not None:
+        info.update(score=score, depth=searched_depth, outcome=None, nodes=NODES_SEARCHED - start_nodes, book=False)
+        if stats is not None:
+            info['stats'] = stats.asDict()
+    return best_move
+
+
+def ponderSearch(text, computer_tile, player_tile, max_depth, results, prediction=None):
+    # Body of the Ponderer process: guesses the move of <player_tile> on the board <text>
+    # (as in boardToString) with a shallow search, unless it's given as <prediction> (like
+    # the reply in the principal variation of the computer's last search), and then searches
+    # the computer's answer to it deeper and deeper, putting in the queue <results>
+    # ('prediction', move) first and then ('move', depth, move, score) for each depth
+    # finished. The transposition table of the process is kept from one depth to the next,
+    # so each one costs little more than searching it alone.
+    board = boardFromString(text)
+    if prediction is None or not isValidMove(board, player_tile, prediction[0], prediction[1]):
+        prediction = getComputerMove(board, player_tile, None, PONDER_PREDICTION_DEPTH)
+    results.put(('prediction', None if prediction is None else tuple(prediction)))
+    if prediction is None:
+        return
+    makeMove(board, player_tile, prediction[0], prediction[1])
+    if not getValidMoves(board, computer_tile)[0]:
+        return  # The computer will have to pass
+    for depth in range(1, max_depth + 1):
+        info = {}
+        move = getComputerMove(board, computer_tile, None, depth, info=info)
+        results.put(('move', depth, tuple(move), info['score']))
+        if info['outcome'] is not None or info['book']:
+            return  # Solved to the end of the game or in the book, deeper searches give the same
+
+
+class Ponderer:
+    # Searches in another process while the opponent thinks: it guesses the opponent's
+    # move on <board> and searches the computer's answer to it, so if the guess is right
+    # the computer already has its move when its turn comes. The GUI only calls poll(),
+    # which never waits, and stop(), which ends the process at once wherever it is.
+    # <prediction> is the opponent's move to expect, if the caller already has a guess.
+    def __init__(self, board, computer_tile, player_tile, max_depth=AI_MAX_DEPTH, prediction=None):
+        import multiprocessing  # Imported here, like concurrent.futures in parallelMinimax
+        self.results = multiprocessing.Queue()
+        self.process = multiprocessing.Process(target=ponderSearch, daemon=True,
+                                               args=(boardToString(board), computer_tile, player_tile, max_depth,
+                                                     self.results, prediction))
+        self.process.start()
+        self.max_depth = max_depth
+        self.prediction = None
+        self.depth = 0  # depth of the best move found for the prediction, 0 if there isn't one yet
+        self.best_move = None
+        self.score = None
+
+    def poll(self):
+        # Reads the results the process has sent so far, without waiting for more.
+        import queue
+        while True:
+            try:
+                result = self.results.get_nowait()
+            except queue.Empty:
+                return
+            if result[0] == 'prediction':
+                self.prediction = result[1]
+            else:
+                _, self.depth, self.best_move, self.score = result
+
+    def hit(self, move):
+        # True if the opponent played the move the ponderer guessed.
+        self.poll()
+        return self.prediction is not None and tuple(move) == self.prediction
+
+    def finished(self):
+        # True when the process has nothing more to search.
+        self.poll()
+        return not self.process.is_alive() and self.results.empty()
+
+    def stop(self):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.results.close()
+
+
+class BackgroundSearch:
+    # Runs getComputerMove in a thread so the GUI can keep drawing and reading events while
+    # the computer thinks. A thread instead of a process like Ponderer, so the search keeps
+    # using (and filling) the transposition table of the game. Python switches threads every
+    # few milliseconds, that's enough for the GUI at FPS frames per second.
+    def __init__(self, board, computer_tile, time_limit=None, max_depth=AI_MAX_DEPTH, stats=None):
+        import threading  # Imported here, like multiprocessing in Ponderer
+        self.token = CancelToken()
+        self.info = {}
+        self.move = None
+        self.cancelled = False
+        self.thread = threading.Thread(target=self.run, daemon=True,
+                                       args=(board, computer_tile, time_limit, max_depth, stats))
+        self.thread.start()
+
+    def run(self, board, computer_tile, time_limit, max_depth, stats):
+        try:
+            self.move = getComputerMove(board, computer_tile, time_limit, max_depth, info=self.info, stats=stats,
+                                        cancel=self.token)
+        except SearchCancelled:
+            self.cancelled = True
+
+    def done(self):
+        # True when the search has finished (or stopped after cancel()), never waits.
+        return not self.thread.is_alive()
+
+    def cancel(self):
+        # Stops the search and waits for the thread, which only takes until it enters its next node.
+        self.token.cancel()
+        self.thread.join()
+
+
+def parallelSpeedup(board, computer_tile, depth, worker_counts=(1, 2, 4, 8, 16)):
+    # Times parallelMinimax without transposition table on <board> for each number of
+    # workers and prints the speedup over one worker. Also checks that every run picks
+    # the move of the serial pvs (see parallelMinimax for when they can differ).
+    import concurrent.futures
+    position = boardToPosition(board, computer_tile)
+    _, serial_move = pvs(position, depth, -SCORE_BOUND, SCORE_BOUND, computer_tile, computer_tile)
+    results = []
+    for workers in worker_counts:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            executor.submit(opponent, computer_tile).result()  # Start the pool before timing
+            start = time.time()
+            _, best_move = parallelMinimax(position, depth, -SCORE_BOUND, SCORE_BOUND, computer_tile, executor, workers)
+            elapsed = time.time() - start
+        results.append((workers, elapsed))
+        print("%2d workers: %7.3f s  speedup %5.2f  move %s%s" % (
+            workers, elapsed, results[0][1] / elapsed, best_move,
+            '' if list(best_move) == list(serial_move) else ' (serial search: %s)' % (serial_move,)))
+    return results
@@ -0,0 +1,203 @@
+# Game records: the moves of a game in the usual notation, a column letter and a row number
+# from a1 to h8 ('f5d6c3...', (x, y) is column x and row y + 1, passes aren't written), or
+# packed one byte per move (x * 8 + y) in binary archives: a header (ARCHIVE_MAGIC) and
+# then every game as its number of moves followed by its moves. Games are written in bulk
+# and read back one at a time with generators, so archives of millions of games are never
+# loaded whole (the binary ones are read with mmap, the text ones line by line).
+#   python othello.py replay games.bin
+#   python othello.py replay selfplay.jsonl --output games.bin
+#   python othello.py replay games.bin --game 3 --show
+
+import argparse, json, mmap, sys, time
+
+import engine
+
+COLUMNS = 'abcdefgh'
+
+
+def moveToString(x, y):
+    return COLUMNS[x] + str(y + 1)
+
+
+def moveFromString(text):
+    # (x, y) of a move in notation, 'f5' or 'F5'.
+    if len(text) != 2 or text[0].lower() not in COLUMNS or text[1] not in '12345678':
+        raise ValueError('%r is not a move from a1 to h8' % text)
+    return COLUMNS.index(text[0].lower()), int(text[1]) - 1
+
+
+def movesToString(moves):
+    return ''.join(moveToString(x, y) for x, y in moves)
+
+
+def movesFromString(text):
+    # The (x, y) moves of a game in notation, whitespace between the moves is ignored.
+    text = ''.join(text.split())
+    if len(text) % 2:
+        raise ValueError('%r is not a list of moves from a1 to h8' % text)
+    return [moveFromString(text[i:i + 2]) for i in range(0, len(text), 2)]
+
+
+def movesToBytes(moves):
+    return bytes(x * 8 + y for x, y in moves)
+
+
+def movesFromBytes(data):
+    return [(square >> 3, square & 7) for square in data]
+
+
+def positionMoves(position):
+    # The moves played to reach the engine.Position <position> from the start (its history).
+    return [(square >> 3, square & 7) for square, *_ in position.history if square is not None]
+
+
+ARCHIVE_MAGIC = b'OTHGAME1'
+
+
+def writeArchive(out, games):
+    # Writes the header of a binary archive and the games (lists of (x, y) moves) of the
+    # iterable <games> to the binary file <out>. Returns the number of games.
+    out.write(ARCHIVE_MAGIC)
+    return appendArchive(out, games)
+
+
+def appendArchive(out, games):
+    # Writes the <games> at the end of the binary archive open in <out>, after the ones it has.
+    count = 0
+    for moves in games:
+        out.write(bytes((len(moves),)) + movesToBytes(moves))
+        count += 1
+    return count
+
+
+def readArchive(path):
+    # Yields the moves of every game of the binary archive <path>, in one pass over an mmap of it.
+    with open(path, 'rb') as archive_file:
+        with mmap.mmap(archive_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:len(ARCHIVE_MAGIC)] != ARCHIVE_MAGIC:
+                raise ValueError('%s is not a game archive' % path)
+            offset = len(ARCHIVE_MAGIC)
+            while offset < len(data):
+                end = offset + 1 + data[offset]
+                if end > len(data):
+                    raise ValueError('%s ends in the middle of a game' % path)
+                yield movesFromBytes(data[offset + 1:end])
+                offset = end
+
+
+def isArchive(path):
+    with open(path, 'rb') as games_file:
+        return games_file.read(len(ARCHIVE_MAGIC)) == ARCHIVE_MAGIC
+
+
+def readGames(path):
+    # Yields the moves of every game of <path>: a binary archive, a text file with the moves of
+    # a game in notation on each line (empty lines and lines starting with # are skipped) or a
+    # JSONL file of othello.py selfplay.
+    if isArchive(path):
+        yield from readArchive(path)
+        return
+    with open(path) as games_file:
+        for line in games_file:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('{'):
+                yield [tuple(move) for move in json.loads(line)['moves']]
+            else:
+                yield movesFromString(line)
+
+
+def writeGames(path, games):
+    # Writes the games (lists of (x, y) moves) of the iterable <games> to <path>, a binary
+    # archive if it ends in .bin and a text file otherwise. Returns the number of games.
+    if path.endswith('.bin'):
+        with open(path, 'wb') as out:
+            return writeArchive(out, games)
+    count = 0
+    with open(path, 'w') as out:
+        for moves in games:
+            out.write(movesToString(moves) + '\n')
+            count += 1
+    return count
+
+
+def replayGame(moves):
+    # Plays the (x, y) <moves> from the start with Position.makeMove (the side without moves
+    # passes) and yields (position, move) before each move and (position, None) at the end.
+    # It's the same engine.Position every time, changed by the next move, copy it to keep it.
+    # Raises ValueError when a move isn't valid (after yielding the position before it).
+    position = engine.getNewPosition()
+    for i, (x, y) in enumerate(moves):
+        if not position.canMove(position.tile):
+            position.passTurn()
+        yield position, (x, y)
+        if not position.makeMove(x, y):
+            raise ValueError('move %d (%s) is not valid' % (i + 1, moveToString(x, y)))
+    yield position, None
+
+
+def gamePositions(path):
+    # Yields (game number, position, move) for every position of every game of <path>, as
+    # replayGame does for each game.
+    for game, moves in enumerate(readGames(path)):
+        for position, move in replayGame(moves):
+            yield game, position, move
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='othello.py replay', description='Replay, check and convert game records.')
+    parser.add_argument('games', help='binary archive, text file of games in notation or JSONL of othello.py selfplay')
+    parser.add_argument('--output', help='write the games to this file too (.bin for a binary archive, else text)')
+    parser.add_argument('--game', type=int, help='only this game (counting from 0)')
+    parser.add_argument('--show', action='store_true', help='print the board after every move')
+    args = parser.parse_args(argv)
+
+    results = {'black': 0, 'white': 0, 'draw': 0}
+    n_games = n_moves = 0
+    start = time.time()
+
+    def replayed():
+        # The games of args.games, replayed (and checked) as the output is written.
+        nonlocal n_games, n_moves
+        for game, moves in enumerate(readGames(args.games)):
+            if args.game is not None and game != args.game:
+                continue
+            try:
+                for position, move in replayGame(moves):
+                    if args.show:
+                        if move is None:
+                            print('game %d ends' % game)
+                        else:
+                            print('game %d, %s to move: %s' % (game, 'black' if position.tile == engine.BLACK_TILE else 'white',
+                                                               moveToString(*move)))
+                        board = engine.boardToString(position.toBoard())
+                        print('\n'.join(board[i:i + 8] for i in range(0, 64, 8)))
+            except ValueError as error:
+                raise SystemExit('game %d: %s' % (game, error))
+            scores = position.scores()
+            if scores[engine.BLACK_TILE] > scores[engine.WHITE_TILE]:
+                results['black'] += 1
+            elif scores[engine.BLACK_TILE] < scores[engine.WHITE_TILE]:
+                results['white'] += 1
+            else:
+                results['draw'] += 1
+            n_games += 1
+            n_moves += len(moves)
+            if args.show:
+                print('black %d, white %d' % (scores[engine.BLACK_TILE], scores[engine.WHITE_TILE]))
+            yield moves
+
+    if args.output is not None:
+        writeGames(args.output, replayed())
+    else:
+        for _ in replayed():
+            pass
+    elapsed = time.time() - start
+    print('%d games (%d moves) replayed in %.1f s, %.0f games/s: black %d, white %d, draws %d' % (
+        n_games, n_moves, elapsed, n_games / elapsed if elapsed else 0, results['black'], results['white'],
+        results['draw']), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,99 @@
+# Load test of the analysis server (server.py): opens some connections, sends a mix
+# of requests on random positions as fast as the server answers them and reports the
+# latency of each method. Start the server first, then run:
+#   python othello.py loadtest --port 8765 --connections 16 --requests 2000
+
+import argparse, asyncio, json, random, sys, time
+
+import engine
+
+
+def randomPositions(n, seed):
+    # <n> (board text, tile) positions reached by random moves from the start.
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < n:
+        board = engine.getNewBoard()
+        engine.resetBoard(board)
+        tile = engine.BLACK_TILE
+        for ply in range(rng.randint(0, 50)):
+            possible_moves = engine.getValidMoves(board, tile)[0]
+            if not possible_moves:
+                break
+            x, y = rng.choice(possible_moves)
+            engine.makeMove(board, tile, x, y)
+            tile = engine.opponent(tile)
+        if engine.getValidMoves(board, tile)[0]:
+            positions.append((engine.boardToString(board), 'B' if tile == engine.BLACK_TILE else 'W'))
+    return positions
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def client(host, port, requests, latencies, errors):
+    # Sends the <requests> one after the other on one connection and records their latency.
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for request in requests:
+            start = time.perf_counter()
+            writer.write((json.dumps(request) + '\n').encode())
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            latencies[request['method']].append(time.perf_counter() - start)
+            if 'error' in response:
+                errors.append(response['error'])
+    finally:
+        writer.close()
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    positions = randomPositions(args.positions, args.seed)
+    methods = ['best_move'] * args.best_move + ['valid_moves'] * args.valid_moves + ['evaluate'] * args.evaluate
+    requests = []
+    for i in range(args.requests):
+        text, tile = rng.choice(positions)
+        request = {'id': i, 'method': rng.choice(methods), 'board': text, 'tile': tile}
+        if request['method'] == 'best_move':
+            request['depth'] = args.depth
+        requests.append(request)
+
+    latencies = {'best_move': [], 'valid_moves': [], 'evaluate': []}
+    errors = []
+    start = time.perf_counter()
+    await asyncio.gather(*[client(args.host, args.port, requests[i::args.connections], latencies, errors)
+                           for i in range(args.connections)])
+    elapsed = time.perf_counter() - start
+
+    print('%d requests in %.2f s (%.0f requests/s), %d errors' % (
+        args.requests, elapsed, args.requests / elapsed, len(errors)))
+    for method, values in latencies.items():
+        if values:
+            print('%-12s %6d requests  p50 %8.2f ms  p99 %8.2f ms  max %8.2f ms' % (
+                method, len(values), 1000 * percentile(values, 0.5), 1000 * percentile(values, 0.99),
+                1000 * max(values)))
+    for error in errors[:5]:
+        print('error:', error, file=sys.stderr)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='othello.py loadtest', description='Load test of the analysis server.')
+    parser.add_argument('--host', default='127.0.0.1', help='address of the server')
+    parser.add_argument('--port', type=int, default=8765, help='port of the server')
+    parser.add_argument('--connections', type=int, default=16, help='clients sending requests at the same time')
+    parser.add_argument('--requests', type=int, default=2000, help='number of requests to send')
+    parser.add_argument('--positions', type=int, default=500, help='number of random positions to ask about')
+    parser.add_argument('--depth', type=int, default=4, help='depth of the best_move requests')
+    parser.add_argument('--best-move', type=int, default=1, help='weight of best_move in the mix of requests')
+    parser.add_argument('--valid-moves', type=int, default=4, help='weight of valid_moves in the mix of requests')
+    parser.add_argument('--evaluate', type=int, default=5, help='weight of evaluate in the mix of requests')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the positions and the requests')
+    args = parser.parse_args(argv)
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
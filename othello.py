@@ -9,20 +9,18 @@
 
 # Modified to add the minimax algorithm by Sergi Magret Goy on 22/05/2020
 
-import random, sys, pygame, time, copy, math
+# The rules, the evaluation and the search are in engine.py, this file only
+# has the pygame interface (pygame is imported when main() runs).
+
+import random, sys, time
 import os.path
-from pygame.locals import *
+from engine import *
+from gamerecord import moveToString, movesToString, positionMoves
 
 FPS = 10  # frames per second to update the screen
 WINDOWWIDTH = 640  # width of the program's window, in pixels
 WINDOWHEIGHT = 480  # height in pixels
 SPACESIZE = 50  # width & height of each space on the board, in pixels
-BOARDWIDTH = 8  # how many columns of spaces on the game board
-BOARDHEIGHT = 8  # how many rows of spaces on the game board
-WHITE_TILE = 'WHITE_TILE'  # an arbitrary but unique value
-BLACK_TILE = 'BLACK_TILE'  # an arbitrary but unique value
-EMPTY_SPACE = 'EMPTY_SPACE'  # an arbitrary but unique value
-HINT_TILE = 'HINT_TILE'  # an arbitrary but unique value
 ANIMATIONSPEED = 50  # integer from 1 to 100, higher is faster animation
 
 # Amount of space on the left & right side (XMARGIN) or above and below
@@ -43,10 +41,15 @@ GRIDLINECOLOR = BLACK
 TEXTCOLOR = WHITE
 HINTCOLOR = BROWN
 
+GAMES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'games.txt')  # finished games, in notation
+
 
 def main():
-    global MAINCLOCK, DISPLAYSURF, FONT, BIGFONT, BGIMAGE
+    global MAINCLOCK, DISPLAYSURF, FONT, BIGFONT, BGIMAGE, pygame
 
+    # pygame is only imported to play, the rest of the program (and the selfplay
+    # command) can run without it.
+    import pygame
     pygame.init()
     MAINCLOCK = pygame.time.Clock()
     DISPLAYSURF = pygame.display.set_mode((WINDOWWIDTH, WINDOWHEIGHT))
@@ -76,13 +79,14 @@ def main():
 def runGame():
     # Plays a single game of reversi each time this function is called.
 
-    # Reset the board and game.
-    mainBoard = getNewBoard()
-    resetBoard(mainBoard)
+    # Reset the board and game. The Position keeps the side to move, which only differs from
+    # the turn after a move when the other side has to pass.
+    mainPosition = getNewPosition()
     showHints = False
+    ponderer = None  # Searches the answer to the player's most likely move while the player thinks
 
     # Draw the starting board and ask the player what color they want.
-    drawBoard(mainBoard)
+    drawBoard(mainPosition)
     playerTile, computerTile = enterPlayerTile()
     turn = 'player' if playerTile == BLACK_TILE else 'computer'
 
@@ -98,7 +102,7 @@ def runGame():
         # Keep looping for player and computer's turns.
         if turn == 'player':
             # Player's turn:
-            if not getValidMoves(mainBoard, playerTile)[0]:
+            if not mainPosition.canMove(playerTile):
                 # If it's the player's turn but they
                 # can't move, then end the game.
                 break
@@ -106,82 +110,132 @@ def runGame():
             while movexy is None:
                 # Keep looping until the player clicks on a valid space.
 
-                # Determine which board data structure to use for display.
-                if showHints:
-                    boardToDraw = getBoardWithValidMoves(mainBoard, playerTile)
-                else:
-                    boardToDraw = mainBoard
+                # The hints come from the moves cached in the position, they are not
+                # generated again every frame.
+                hints = mainPosition.validMoves()[0] if showHints else ()
 
                 checkForQuit()
                 for event in pygame.event.get():  # event handling loop
-                    if event.type == MOUSEBUTTONUP:
+                    if event.type == pygame.MOUSEBUTTONUP:
                         # Handle mouse click events
                         mousex, mousey = event.pos
                         if newGameRect.collidepoint((mousex, mousey)):
                             # Start a new game
+                            if ponderer is not None:
+                                ponderer.stop()
                             return True
                         elif hintsRect.collidepoint((mousex, mousey)):
                             # Toggle hints mode
                             showHints = not showHints
                         # movexy is set to a two-item tuple XY coordinate, or None value
                         movexy = getSpaceClicked(mousex, mousey)
-                        if movexy != None and not isValidMove(mainBoard, playerTile, movexy[0], movexy[1]):
+                        if movexy != None and not mainPosition.flips(movexy[0], movexy[1]):
                             movexy = None
 
                 # Draw the game board.
-                drawBoard(boardToDraw)
-                drawInfo(boardToDraw, playerTile, computerTile, turn)
+                drawBoard(mainPosition, hints)
+                drawInfo(mainPosition, playerTile, computerTile, turn)
 
                 # Draw the "New Game" and "Hints" buttons.
                 DISPLAYSURF.blit(newGameSurf, newGameRect)
                 DISPLAYSURF.blit(hintsSurf, hintsRect)
 
+                if ponderer is not None:
+                    ponderer.poll()
                 MAINCLOCK.tick(FPS)
                 pygame.display.update()
 
             # Make the move and end the turn.
-            print("next move by the human:", movexy[0], movexy[1])
-            makeMove(mainBoard, playerTile, movexy[0], movexy[1], True)
-            valid_moves = getValidMoves(mainBoard, computerTile)[0]
-            print(len(valid_moves), "valid moves by the computer:", valid_moves)
+            print("next move by the human:", moveToString(*movexy))
+            flips = mainPosition.makeMove(movexy[0], movexy[1])
+            animateTileChange(bbToSpaces(flips), playerTile, movexy)
+            valid_moves = mainPosition.validMoves()[0]
+            print(len(valid_moves), "valid moves by the computer:", movesToString(valid_moves))
+            if ponderer is not None:
+                if valid_moves and ponderer.hit(movexy):
+                    print("the AI guessed the move, pondered to depth %d" % ponderer.depth)
+                else:
+                    ponderer.stop()
+                    ponderer = None
             if valid_moves:
                 # Only set for the computer's turn if it can make a move.
                 turn = 'computer'
+            else:
+                mainPosition.passTurn()
 
         else:
             # Computer's turn:
-            possible_moves = getValidMoves(mainBoard, computerTile)[0]
-            if not possible_moves:
+            if not mainPosition.canMove(computerTile):
                 # If it was set to be the computer's turn but
                 # they can't move, then end the game.
                 break
 
             # Draw the board.
-            drawBoard(mainBoard)
-            drawInfo(mainBoard, playerTile, computerTile, turn)
+            drawBoard(mainPosition)
+            drawInfo(mainPosition, playerTile, computerTile, turn)
 
             # Draw the "New Game" and "Hints" buttons.
             DISPLAYSURF.blit(newGameSurf, newGameRect)
             DISPLAYSURF.blit(hintsSurf, hintsRect)
 
-            # Make it look like the computer is thinking by pausing a bit.
+            # Make it look like the computer is thinking by pausing a bit. The window keeps
+            # being drawn while the computer thinks, and New Game or Quit stop the search.
             pauseUntil = time.time() + random.randint(5, 15) * 0.1
-            while time.time() < pauseUntil:
-                pygame.display.update()
+
+            if ponderer is not None:
+                # The player played the guessed move, let the ponderer go on until it reaches
+                # the usual depth or the time of a normal search ends, and take its move.
+                thinkUntil = time.time() + AI_TIME_LIMIT if AI_TIME_LIMIT is not None else None
+                pondered = waitForComputer(pauseUntil, lambda: ponderer.depth >= AI_MAX_DEPTH or ponderer.finished() or
+                                           (thinkUntil is not None and time.time() >= thinkUntil), newGameRect)
+                ponderer.stop()
+                if not pondered:
+                    return True
 
             # Make the move and end the turn.
-            x, y = getComputerMove(mainBoard, computerTile)
-            print("next move by the AI:", x, y)
-            makeMove(mainBoard, computerTile, x, y, True)
-            valid_moves = getValidMoves(mainBoard, playerTile)[0]
-            print(len(valid_moves), "valid moves by the player:", valid_moves)
+            prediction = None  # the player's reply expected by the search, pondered next
+            if ponderer is not None and ponderer.depth > 0:
+                x, y = ponderer.best_move
+                print("next move by the AI:", moveToString(x, y))
+                print("move found pondering, searched to depth %d" % ponderer.depth)
+            else:
+                search_stats = SearchStats()
+                search = BackgroundSearch(mainPosition.toBoard(), computerTile, AI_TIME_LIMIT, AI_MAX_DEPTH, stats=search_stats)
+                if not waitForComputer(pauseUntil, search.done, newGameRect):
+                    search.cancel()
+                    return True
+                x, y = search.move
+                search_info = search.info
+                if len(search_stats.pv) > 1 and search_stats.pv[0] == [x, y]:
+                    prediction = search_stats.pv[1]
+                print("next move by the AI:", moveToString(x, y))
+                if search_info['book']:
+                    print("move from the opening book (searched to depth %d)" % search_info['depth'])
+                else:
+                    print("searched to depth %d:" % search_info['depth'], search_stats.summary())
+                if search_info['outcome'] is not None:
+                    print("endgame solved, proven %s for the AI by %s" % (search_info['outcome'], abs(search_info['score'])))
+            ponderer = None
+            flips = mainPosition.makeMove(x, y)
+            animateTileChange(bbToSpaces(flips), computerTile, (x, y))
+            valid_moves = mainPosition.validMoves()[0]
+            print(len(valid_moves), "valid moves by the player:", movesToString(valid_moves))
             if valid_moves:
                 # Only set for the player's turn if they can make a move.
                 turn = 'player'
+                ponderer = Ponderer(mainPosition.toBoard(), computerTile, playerTile, prediction=prediction)
+            else:
+                mainPosition.passTurn()
 
     # Display the final score.
-    drawBoard(mainBoard)
-    scores = getScoreOfBoard(mainBoard)
+    drawBoard(mainPosition)
+    scores = mainPosition.scores()
+
+    # Keep the game record, one game per line (see gamerecord.py, python othello.py replay games.txt).
+    record = movesToString(positionMoves(mainPosition))
+    print("game record:", record)
+    with open(GAMES_FILE, 'a') as gamesFile:
+        gamesFile.write(record + '\n')
 
     # Determine the text of the message to display.
     if scores[playerTile] > scores[computerTile]:
@@ -217,7 +271,7 @@ def runGame():
         # Process events until the user clicks on Yes or No.
         checkForQuit()
         for event in pygame.event.get():  # event handling loop
-            if event.type == MOUSEBUTTONUP:
+            if event.type == pygame.MOUSEBUTTONUP:
                 mousex, mousey = event.pos
                 if yesRect.collidepoint((mousex, mousey)):
                     return True
@@ -265,7 +319,7 @@ def animateTileChange(tilesToFlip, tileColor, additionalTile):
         checkForQuit()
 
 
-def drawBoard(board):
+def drawBoard(position, hints=()):
     # Draw background of board.
     DISPLAYSURF.blit(BGIMAGE, BGIMAGE.get_rect())
 
@@ -289,14 +343,16 @@ def drawBoard(board):
     for x in range(BOARDWIDTH):
         for y in range(BOARDHEIGHT):
             centerx, centery = translateBoardToPixelCoord(x, y)
-            if board[x][y] == WHITE_TILE or board[x][y] == BLACK_TILE:
-                if board[x][y] == WHITE_TILE:
+            tile = position.get(x, y)
+            if tile == WHITE_TILE or tile == BLACK_TILE:
+                if tile == WHITE_TILE:
                     tileColor = WHITE
                 else:
                     tileColor = BLACK
                 pygame.draw.circle(DISPLAYSURF, tileColor, (centerx, centery), int(SPACESIZE / 2) - 4)
-            if board[x][y] == HINT_TILE:
-                pygame.draw.rect(DISPLAYSURF, HINTCOLOR, (centerx - 4, centery - 4, 8, 8))
+    for x, y in hints:
+        centerx, centery = translateBoardToPixelCoord(x, y)
+        pygame.draw.rect(DISPLAYSURF, HINTCOLOR, (centerx - 4, centery - 4, 8, 8))
 
 
 def getSpaceClicked(mousex, mousey):
@@ -312,9 +368,9 @@ def getSpaceClicked(mousex, mousey):
     return None
 
 
-def drawInfo(board, playerTile, computerTile, turn):
+def drawInfo(position, playerTile, computerTile, turn):
     # Draws scores and whose turn it is at the bottom of the screen.
-    scores = getScoreOfBoard(board)
+    scores = position.scores()
     scoreSurf = FONT.render("Player Score: %s    Computer Score: %s    %s's Turn" % (
         str(scores[playerTile]), str(scores[computerTile]), turn.title()), True, TEXTCOLOR)
     scoreRect = scoreSurf.get_rect()
@@ -322,122 +378,6 @@ def drawInfo(board, playerTile, computerTile, turn):
     DISPLAYSURF.blit(scoreSurf, scoreRect)
 
 
-def resetBoard(board):
-    # Blanks out the board it is passed, and sets up starting tiles.
-    for x in range(BOARDWIDTH):
-        for y in range(BOARDHEIGHT):
-            board[x][y] = EMPTY_SPACE
-
-    # Add starting pieces to the center
-    board[3][3] = WHITE_TILE
-    board[3][4] = BLACK_TILE
-    board[4][3] = BLACK_TILE
-    board[4][4] = WHITE_TILE
-
-
-def getNewBoard():
-    # Creates a brand new, empty board data structure.
-    board = []
-    for i in range(BOARDWIDTH):
-        board.append([EMPTY_SPACE] * BOARDHEIGHT)
-
-    return board
-
-
-def isValidMove(board, tile, xstart, ystart):
-    # Returns False if the player's move is invalid. If it is a valid
-    # move, returns a list of spaces of the captured pieces.
-    if board[xstart][ystart] != EMPTY_SPACE or not isOnBoard(xstart, ystart):
-        return False
-
-    board[xstart][ystart] = tile  # temporarily set the tile on the board.
-
-    if tile == WHITE_TILE:
-        otherTile = BLACK_TILE
-    else:
-        otherTile = WHITE_TILE
-
-    tilesToFlip = []
-    # check each of the eight directions:
-    for xdirection, ydirection in [[0, 1], [1, 1], [1, 0], [1, -1], [0, -1], [-1, -1], [-1, 0], [-1, 1]]:
-        x, y = xstart, ystart
-        x += xdirection
-        y += ydirection
-        if isOnBoard(x, y) and board[x][y] == otherTile:
-            # The piece belongs to the other player next to our piece.
-            x += xdirection
-            y += ydirection
-            if not isOnBoard(x, y):
-                continue
-            while board[x][y] == otherTile:
-                x += xdirection
-                y += ydirection
-                if not isOnBoard(x, y):
-                    break  # break out of while loop, continue in for loop
-            if not isOnBoard(x, y):
-                continue
-            if board[x][y] == tile:
-                # There are pieces to flip over. Go in the reverse
-                # direction until we reach the original space, noting all
-                # the tiles along the way.
-                while True:
-                    x -= xdirection
-                    y -= ydirection
-                    if x == xstart and y == ystart:
-                        break
-                    tilesToFlip.append((x, y))
-
-    board[xstart][ystart] = EMPTY_SPACE  # make space empty
-    if len(tilesToFlip) == 0:  # If no tiles flipped, this move is invalid
-        return False
-    return tilesToFlip
-
-
-def isOnBoard(x, y):
-    # Returns True if the coordinates are located on the board.
-    return x >= 0 and x < BOARDWIDTH and y >= 0 and y < BOARDHEIGHT
-
-
-def getBoardWithValidMoves(board, tile):
-    # Returns a new board with hint markings.
-    dupeBoard = copy.deepcopy(board)
-
-    for x, y in getValidMoves(dupeBoard, tile)[0]:
-        dupeBoard[x][y] = HINT_TILE
-    return dupeBoard
-
-
-def getValidMoves(board, tile):
-    # Returns a list of (x,y) tuples of all valid moves.
-    validMoves = []
-    tiles_to_flip = []
-    reorder = False
-
-    for x in range(BOARDWIDTH):
-        for y in range(BOARDHEIGHT):
-            flip = isValidMove(board, tile, x, y)
-            if flip:
-                validMoves.append((x, y))
-                tiles_to_flip.append(len(flip))
-                if not reorder and (isX(x, y) or isC(x, y) or isCorner(x, y)):  # If there is not a special tile to reorder and the current tile is special, then we set reorder to True
-                    reorder = True
-
-    return validMoves, tiles_to_flip, reorder
-
-
-def getScoreOfBoard(board):
-    # Determine the score by counting the tiles.
-    xscore = 0
-    oscore = 0
-    for x in range(BOARDWIDTH):
-        for y in range(BOARDHEIGHT):
-            if board[x][y] == WHITE_TILE:
-                xscore += 1
-            if board[x][y] == BLACK_TILE:
-                oscore += 1
-    return {WHITE_TILE: xscore, BLACK_TILE: oscore}
-
-
 def enterPlayerTile():
     # Draws the text and handles the mouse click events for letting
     # the player choose which color they want to be.  Returns
@@ -461,7 +401,7 @@ def enterPlayerTile():
         # Keep looping until the player has clicked on a color.
         checkForQuit()
         for event in pygame.event.get():  # event handling loop
-            if event.type == MOUSEBUTTONUP:
+            if event.type == pygame.MOUSEBUTTONUP:
                 mousex, mousey = event.pos
                 if xRect.collidepoint((mousex, mousey)):
                     return [WHITE_TILE, BLACK_TILE]
@@ -476,292 +416,54 @@ def enterPlayerTile():
         MAINCLOCK.tick(FPS)
 
 
-def makeMove(board, tile, xstart, ystart, realMove=False):
-    # Place the tile on the board at xstart, ystart, and flip tiles
-    # Returns False if this is an invalid move, tilesToFlip if it is valid.
-    tilesToFlip = isValidMove(board, tile, xstart, ystart)
-    if not tilesToFlip:
-        return False
-
-    board[xstart][ystart] = tile
-
-    if realMove:
-        animateTileChange(tilesToFlip, tile, (xstart, ystart))
-
-    for x, y in tilesToFlip:
-        board[x][y] = tile
-    return tilesToFlip
-
-
-def undoMove(board, tile, xstart, ystart, tiles_to_flip):
-    # This function is not used in the final program.
-    # Remove a move from the board, [<xstart>,<ystart>] i assigned as empty
-    # then all the tiles that have been flipped are flipped over to reassign them to the opponent of <tile>
-
-    if not tiles_to_flip:
-        return False
-
-    board[xstart][ystart] = EMPTY_SPACE
-
-    for x, y in tiles_to_flip:
-        board[x][y] = opponent(tile)
+def waitForComputer(until, ready, newGameRect):
+    # Keeps the window responsive while the computer thinks: redraws it at FPS frames per
+    # second and handles Quit until time.time() reaches <until> and ready() is True.
+    # Returns False if the player clicked on New Game meanwhile, other clicks are ignored.
+    while time.time() < until or not ready():
+        checkForQuit()
+        for event in pygame.event.get():  # event handling loop
+            if event.type == pygame.MOUSEBUTTONUP and newGameRect.collidepoint(event.pos):
+                return False
+        MAINCLOCK.tick(FPS)
+        pygame.display.update()
     return True
 
 
-def opponent(tile):
-    # Returns the opponent of tile
-    return WHITE_TILE if tile == BLACK_TILE else BLACK_TILE
-
-
-def isCorner(x, y):
-    # Check if a position is in any of the board's corners
-    if x == 0 and y == 0:  # Top left corner
-        return True
-    elif x == 0 and y == 7:  # Top right corner
-        return True
-    elif x == 7 and y == 0:  # Bottom left corner
-        return True
-    elif x == 7 and y == 7:  # Bottom right corner
-        return True
-    else:
-        return False
-
-
-def isEdge(x, y):
-    # Returns true if position [x,y] is on the edge of the board, false otherwise
-    # Except when is a corner, then returns false
-    if isCorner(x, y):
-        return False
-    elif x == 0 or y == 0 or x == BOARDWIDTH - 1 or y == BOARDHEIGHT - 1:
-        return True
-    else:
-        return False
-
-
-def surroundedBy(board, x, y, player):
-    # Check if a position is surrounded by a lot of pieces of the same colour as <player>
-    # A position is good if it's surrounded by a lot of pieces of the same colour as <player>
-    # but it's also bad if it's surrounded by a lot of pieces owned by the opponent
-    value = 0
-    positions_to_check = [(x - 1, y - 1), (x, y - 1), (x + 1, y - 1), (x + 1, y), (x + 1, y + 1), (x, y + 1),
-                          (x - 1, y + 1), (x - 1, y)]
-    for x_to_check, y_to_check in positions_to_check:
-        if isOnBoard(x_to_check, y_to_check):
-            if board[x_to_check][y_to_check] == player:
-                value += 5
-            elif board[x_to_check][y_to_check] == opponent(player):
-                value -= 2
-            else:
-                value -= 2
-    return value
-
-
-def isC(x, y):
-    # Check if the position [x,y] is a C as marked below
-    #   0 1 2 3 4 5 6 7
-    # 0 . C . . . . C .
-    # 1 C X . . . . X C
-    # 2 . . . . . . . .
-    # 3 . . . . . . . .
-    # 4 . . . . . . . .
-    # 5 . . . . . . . .
-    # 6 C X . . . . X C
-    # 7 . C . . . . C .
-    if y == 0 and (x == 1 or x == 6):
-        return True
-    elif y == 1 and (x == 0 or x == 7):
-        return True
-    elif y == 6 and (x == 0 or x == 7):
-        return True
-    elif y == 7 and (x == 1 or x == 6):
-        return True
-    else:
-        return False
-
-
-def isX(x, y):
-    # Check if the position [x,y] is an X as marked below
-    #   0 1 2 3 4 5 6 7
-    # 0 . C . . . . C .
-    # 1 C X . . . . X C
-    # 2 . . . . . . . .
-    # 3 . . . . . . . .
-    # 4 . . . . . . . .
-    # 5 . . . . . . . .
-    # 6 C X . . . . X C
-    # 7 . C . . . . C .
-    if y == 1 and (x == 1 or x == 6):
-        return True
-    elif y == 6 and (x == 1 or x == 6):
-        return True
-    else:
-        return False
-
-
-def valueOfOpponentMoves(opponent_moves):
-    # The less moves your opponent can perfom the better for the AI
-    n_op_moves = len(opponent_moves)
-    if n_op_moves == 0:
-        return 50
-    elif n_op_moves == 1:
-        return 10
-    elif n_op_moves <= 5:
-        return 10
-    elif n_op_moves <= 10:
-        return -10
-    else:
-        return -50
-
-
-def valueOfPossibleMoves(possible_moves):
-    # The more moves you (AI) can perform the better
-    n_moves = len(possible_moves)
-    if n_moves == 0:
-        return -50
-    elif n_moves == 1:
-        return -10
-    elif n_moves <= 5:
-        return 10
-    elif n_moves <= 10:
-        return 20
-    else:
-        return 50
-
-
-def reorderMoves(moves_ordered):
-    # Reorder the moves in <moves_ordered> so the it's in the next order: [corners, other_tiles, cs, xs]
-    # It's sorted form most important moves to less important moves
-    corners = []
-    xs = []
-    cs = []
-    others = []
-    for i in range(len(moves_ordered)):
-        x, y = moves_ordered[i]
-        if isCorner(x, y):
-            corners.append((x, y))
-        elif isC(x, y):
-            cs.append((x, y))
-        elif isX(x, y):
-            xs.append((x, y))
-        else:
-            others.append((x, y))
-
-    corners.extend(others)
-    corners.extend(cs)
-    corners.extend(xs)
-
-    return corners
-
-
-def cornerAroundBy(board, x, y, player):
-    # Returns true if there is a corner around [x,y] position owned by <player>, otherwise false
-    positions_to_check = [(x - 1, y - 1), (x, y - 1), (x + 1, y - 1), (x + 1, y), (x + 1, y + 1), (x, y + 1),
-                          (x - 1, y + 1), (x - 1, y)]
-    for x_to_check, y_to_check in positions_to_check:
-        if isOnBoard(x_to_check, y_to_check) and isCorner(x_to_check, y_to_check) and board[x_to_check][y_to_check] == player:
-            return True
-
-    return False
-
-
-def h(board, computer_tile, possible_moves):
-    opponent_moves = getValidMoves(board, opponent(computer_tile))[0]
-    h_value = 0
-    h_value += valueOfOpponentMoves(opponent_moves)
-    h_value += valueOfPossibleMoves(possible_moves)
-
-    for x in range(BOARDWIDTH):
-        for y in range(BOARDHEIGHT):
-            h_value += surroundedBy(board, x, y, computer_tile)
-            if board[x][y] == computer_tile:
-                h_value += 1
-                if isCorner(x, y):
-                    h_value += 100
-                if isEdge(x, y):
-                    h_value += 20
-                if isC(x, y):
-                    if cornerAroundBy(board, x, y, computer_tile):
-                        h_value += 20
-                    else:
-                        h_value -= 50
-                if isX(x, y):
-                    if cornerAroundBy(board, x, y, computer_tile):
-                        h_value += 20
-                    else:
-                        h_value -= 90
-            elif board[x][y] == opponent(computer_tile):
-                h_value -= 1
-                if isCorner(x, y):
-                    h_value -= 100
-                if isEdge(x, y):
-                    h_value -= 10
-                if isC(x, y):
-                    h_value += 50
-                if isX(x, y):
-                    h_value += 90
-
-    return h_value
-
-
-def minimax(board, depth, alfa, beta, player, computer_tile):
-    possible_moves, number_of_tiles_to_flip, reorder = getValidMoves(board, computer_tile)
-    if depth == 0: return h(board, computer_tile, possible_moves), None
-    if not possible_moves: return h(board, computer_tile, possible_moves), None
-
-    # Sort the moves by the number of tiles they would flip, the biggest the tiles to flip
-    # are at front. To make it a little random and not to play always the same moves, when a
-    # random number is 0, we shuffle randomly the moves instead on sorting them.
-    random.seed()
-    num = random.randint(0, 100)
-    if num != 0:
-        possible_moves = [move for _, move in sorted(zip(number_of_tiles_to_flip, possible_moves), reverse=True)]
-        if reorder:  # Only if there's any special positions where to move next is necessary to reorder
-            possible_moves = reorderMoves(possible_moves)
-    else:
-        random.shuffle(possible_moves)
-
-    if player == computer_tile:  # IA turn
-        best_move = possible_moves[0]
-        # To prune and make it run faster, we only check for 2/3 of the possible moves
-        for x, y in possible_moves[:math.floor(2 * len(possible_moves) / 3)]:
-            dupeBoard = copy.deepcopy(board)
-            makeMove(dupeBoard, computer_tile, x, y)
-            move_value, _ = minimax(dupeBoard, depth - 1, alfa, beta, opponent(player), computer_tile)
-            if move_value > alfa:
-                alfa = move_value
-                best_move = [x, y]
-
-            if alfa >= beta:
-                break  # Tall beta
-
-        return alfa, best_move
-    else:  # Human player turn
-        best_move = possible_moves[0]
-        # To prune and make it run faster, we only check for 2/3 of the possible moves
-        for x, y in possible_moves[:math.floor(2 * len(possible_moves) / 3)]:
-            dupeBoard = copy.deepcopy(board)
-            makeMove(dupeBoard, computer_tile, x, y)
-            move_value, _ = minimax(dupeBoard, depth - 1, alfa, beta, opponent(player), computer_tile)
-            if move_value < beta:
-                beta = move_value
-                best_move = [x, y]
-            if alfa >= beta:
-                break  # Tall alfa
-
-        return beta, best_move
-
-
-def getComputerMove(board, computer_tile):
-    _, best_move = minimax(board, 10, -1000, 1000, computer_tile, computer_tile)
-    return best_move
-
-
 def checkForQuit():
-    for event in pygame.event.get((QUIT, KEYUP)):  # event handling loop
-        if event.type == QUIT or (event.type == KEYUP and event.key == K_ESCAPE):
+    for event in pygame.event.get((pygame.QUIT, pygame.KEYUP)):  # event handling loop
+        if event.type == pygame.QUIT or (event.type == pygame.KEYUP and event.key == pygame.K_ESCAPE):
             pygame.quit()
             sys.exit()
 
 
 if __name__ == '__main__':
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] == 'selfplay':
+        import selfplay
+        selfplay.main(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == 'bench':
+        import benchmark
+        benchmark.main(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == 'book':
+        import book
+        book.main(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        import server
+        server.main(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == 'loadtest':
+        import loadtest
+        loadtest.main(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == 'perft':
+        import perft
+        sys.exit(perft.main(sys.argv[2:]))
+    elif len(sys.argv) > 1 and sys.argv[1] == 'probcut':
+        import probcut
+        probcut.main(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == 'train':
+        import train
+        train.main(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == 'replay':
+        import gamerecord
+        gamerecord.main(sys.argv[2:])
+    else:
+        main()
@@ -0,0 +1,55 @@
+# perft of the Othello engine: counts the positions reachable in 1, 2, ... --depth plies
+# with the move generator of the search (Position.validMoves/makeMove/undoMove) and with
+# the bare bitboard one (bbValidMoves/bbFlips), and from the start position checks them against
+# the reference counts in engine.PERFT_COUNTS. Any new move generator has to pass it.
+#   python othello.py perft --depth 7
+#   python othello.py perft --depth 5 --board <64 chars as in engine.boardFromString> --tile W
+
+import argparse, sys, time
+
+import engine
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='othello.py perft', description='Count the positions reachable in N plies.')
+    parser.add_argument('--depth', type=int, default=7, help='deepest ply to count')
+    parser.add_argument('--board', default=None, help='board as in engine.boardFromString, the start position if not given')
+    parser.add_argument('--tile', choices=['B', 'W'], default='B', help='side to move')
+    parser.add_argument('--generators', nargs='+', default=['position', 'bitboard'], choices=['position', 'bitboard'],
+                        help='move generators to count with')
+    args = parser.parse_args(argv)
+
+    if args.board is None:
+        board = engine.getNewBoard()
+        engine.resetBoard(board)
+        reference = engine.PERFT_COUNTS if args.tile == 'B' else None
+    else:
+        board = engine.boardFromString(args.board)
+        reference = None
+    tile = engine.BLACK_TILE if args.tile == 'B' else engine.WHITE_TILE
+    own, opp = engine.boardToBitboards(board, tile)
+
+    failed = False
+    print('%5s %-9s %12s %9s %12s' % ('depth', 'generator', 'positions', 'seconds', 'positions/s'))
+    for depth in range(1, args.depth + 1):
+        for generator in args.generators:
+            start = time.time()
+            if generator == 'position':
+                count = engine.perft(board, tile, depth)
+            else:
+                count = engine.bbPerft(own, opp, depth)
+            elapsed = time.time() - start
+            check = ''
+            if reference is not None and depth < len(reference):
+                if count == reference[depth]:
+                    check = '  ok'
+                else:
+                    check = '  WRONG, expected %d' % reference[depth]
+                    failed = True
+            print('%5d %-9s %12d %9.3f %12.0f%s' % (depth, generator, count, elapsed,
+                                                    count / elapsed if elapsed else 0, check))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
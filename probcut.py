@@ -0,0 +1,114 @@
+# Fitting of the ProbCut parameters of the engine (engine.PROBCUT_PARAMETERS). Positions
+# are taken from self-play games and searched with pvs, without selective search, to every
+# depth and to its ProbCut shallow depth, for both sides as the computer. For each stage of
+# the game and depth, v_deep = a * v_shallow + b is fitted by least squares and sigma is the
+# deviation of the errors. It prints the table to put in engine.py.
+#   python othello.py selfplay --games 200 --depth 4 --output selfplay.jsonl
+#   python othello.py probcut --games selfplay.jsonl --positions 400 --depths 3 4 5 6 7
+
+import argparse, math, random, sys, time
+import concurrent.futures
+
+import engine
+import gamerecord
+
+
+def gamePositions(path, rng, per_game):
+    # Reads the self-play games of <path> (any file of gamerecord.readGames) one at a time and
+    # yields <per_game> random positions of each one, before the endgame and with the side to
+    # move able to move.
+    for moves in gamerecord.readGames(path):
+        positions = [position.copy() for position, move in gamerecord.replayGame(moves)
+                     if move is not None and position.empties() > engine.ENDGAME_EMPTIES]
+        yield from rng.sample(positions, min(per_game, len(positions)))
+
+
+def searchValues(black, white, tile, max_depth):
+    # Worker side: pvs values of the position at depths 1 to <max_depth>, for the side to
+    # move <tile> being the computer and for its opponent being it. Returns the two lists.
+    engine.PROBCUT_THRESHOLD = None  # The parameters are fitted on the exact values
+    engine.LMR_REDUCTION = 0
+    table = engine.getTranspositionTable()
+    position = engine.Position(black, white, tile)
+    results = []
+    for computer_tile in (tile, engine.opponent(tile)):
+        table.clear()
+        key = engine.zobristHash(position.toBoard(), tile)
+        if computer_tile == engine.WHITE_TILE:
+            key ^= engine.ZOBRIST_WHITE_COMPUTER
+        evaluation = engine.newEvaluation(position, computer_tile)
+        ordering = engine.MoveOrdering()
+        results.append([engine.pvs(position, depth, -engine.SCORE_BOUND, engine.SCORE_BOUND, tile, computer_tile,
+                                   table, key, None, evaluation, None, 0, ordering)[0]
+                        for depth in range(1, max_depth + 1)])
+    return results
+
+
+def fitLine(pairs):
+    # Least squares a, b of y = a * x + b for the (x, y) <pairs>, and the deviation of the errors.
+    n = len(pairs)
+    mean_x = sum(x for x, _ in pairs) / n
+    mean_y = sum(y for _, y in pairs) / n
+    variance = sum((x - mean_x) ** 2 for x, _ in pairs)
+    a = sum((x - mean_x) * (y - mean_y) for x, y in pairs) / variance if variance else 1.0
+    b = mean_y - a * mean_x
+    sigma = math.sqrt(sum((y - a * x - b) ** 2 for x, y in pairs) / n)
+    return a, b, sigma
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='othello.py probcut', description='Fit the ProbCut parameters of the engine.')
+    parser.add_argument('--games', required=True, help='games of othello.py selfplay (JSONL) or any gamerecord.py file')
+    parser.add_argument('--positions', type=int, default=400, help='number of positions to search')
+    parser.add_argument('--per-game', type=int, default=2, help='positions taken from each game')
+    parser.add_argument('--depths', type=int, nargs='+', default=[3, 4, 5, 6, 7], help='depths to fit')
+    parser.add_argument('--min-samples', type=int, default=30, help='stages and depths with fewer samples are not fitted')
+    parser.add_argument('--workers', type=int, default=1, help='number of processes searching positions')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the choice of positions')
+    args = parser.parse_args(argv)
+    if min(args.depths) < engine.PROBCUT_MIN_DEPTH:
+        parser.error('ProbCut is only used from depth %d' % engine.PROBCUT_MIN_DEPTH)
+
+    max_depth = max(args.depths)
+    samples = {}  # (stage, depth): [(shallow value, deep value)]
+    start = time.time()
+    searched = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as executor:
+        positions = gamePositions(args.games, random.Random(args.seed), args.per_game)
+        pending = {}
+        while True:
+            # A few positions queued at a time, the games file is never read whole.
+            while len(pending) < 2 * args.workers and searched + len(pending) < args.positions:
+                position = next(positions, None)
+                if position is None:
+                    break
+                future = executor.submit(searchValues, position.black, position.white, position.tile, max_depth)
+                pending[future] = engine.probCutStage(position.empties())
+            if not pending:
+                break
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                stage = pending.pop(future)
+                for values in future.result():
+                    for depth in args.depths:
+                        shallow = values[engine.probCutShallowDepth(depth) - 1]
+                        deep = values[depth - 1]
+                        if max(abs(shallow), abs(deep)) >= engine.WIN_SCORE:
+                            continue  # A search that saw the end of the game, not a heuristic value
+                        samples.setdefault((stage, depth), []).append((shallow, deep))
+                searched += 1
+    print('%d positions searched in %.1f s' % (searched, time.time() - start), file=sys.stderr)
+
+    print('PROBCUT_PARAMETERS = {  # (stage, depth): (a, b, sigma)')
+    for stage, depth in sorted(samples):
+        pairs = samples[(stage, depth)]
+        if len(pairs) < args.min_samples:
+            print('stage %d depth %d: only %d samples, not fitted' % (stage, depth, len(pairs)), file=sys.stderr)
+            continue
+        a, b, sigma = fitLine(pairs)
+        print('    (%d, %d): (%.3f, %.1f, %.1f),  # %d samples' % (stage, depth, a, b, sigma, len(pairs)))
+    print('}')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
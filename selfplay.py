@@ -0,0 +1,114 @@
+# Headless self-play for the Othello engine: plays engine-vs-engine games in
+# parallel processes and streams one JSON line per game as each one finishes.
+# It doesn't need pygame, run it with:
+#   python othello.py selfplay --games 10000 --workers 16 --depth 6 --output games.jsonl
+# --record also writes the moves of the games to a binary archive of gamerecord.py, which
+# takes one byte per move instead of the JSON of the records.
+
+import argparse, json, random, sys, time
+import concurrent.futures
+
+import engine
+import gamerecord
+
+
+def playGame(game, seed, depth, time_limit, random_plies, endgame_empties, probcut, lmr):
+    # Plays a whole game with getComputerMove on both sides and returns its record. The
+    # first <random_plies> moves are random (from <seed>) so the games don't all repeat.
+    rng = random.Random(seed)
+    engine.ENDGAME_EMPTIES = endgame_empties
+    engine.PROBCUT_THRESHOLD = probcut
+    engine.LMR_REDUCTION = lmr
+    engine.getTranspositionTable().clear()  # Every game starts from the same state
+    engine.setSearchSeed(seed)
+
+    board = engine.getNewBoard()
+    engine.resetBoard(board)
+    tile = engine.BLACK_TILE
+    moves = []
+    move_times = []
+    nodes = []
+    start = time.time()
+    while True:
+        possible_moves = engine.getValidMoves(board, tile)[0]
+        if not possible_moves:
+            tile = engine.opponent(tile)  # Pass
+            if not engine.getValidMoves(board, tile)[0]:
+                break  # Neither side can move, the game is over
+            continue
+
+        move_start = time.time()
+        info = {'nodes': 0}
+        if len(moves) < random_plies:
+            x, y = rng.choice(possible_moves)
+        else:
+            x, y = engine.getComputerMove(board, tile, time_limit, depth, info=info)
+        move_times.append(round(time.time() - move_start, 6))
+        nodes.append(info['nodes'])
+        engine.makeMove(board, tile, x, y)
+        moves.append([x, y])
+        tile = engine.opponent(tile)
+
+    scores = engine.getScoreOfBoard(board)
+    if scores[engine.BLACK_TILE] > scores[engine.WHITE_TILE]:
+        winner = 'black'
+    elif scores[engine.BLACK_TILE] < scores[engine.WHITE_TILE]:
+        winner = 'white'
+    else:
+        winner = 'draw'
+    return {'game': game, 'seed': seed, 'moves': moves, 'black': scores[engine.BLACK_TILE],
+            'white': scores[engine.WHITE_TILE], 'winner': winner, 'move_times': move_times,
+            'nodes': nodes, 'duration': round(time.time() - start, 6)}
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='othello.py selfplay', description='Play engine-vs-engine games without GUI.')
+    parser.add_argument('--games', type=int, default=100, help='number of games to play')
+    parser.add_argument('--workers', type=int, default=1, help='number of processes playing games')
+    parser.add_argument('--depth', type=int, default=6, help='search depth of both sides')
+    parser.add_argument('--time-limit', type=float, default=None, help='seconds per move (iterative deepening up to --depth)')
+    parser.add_argument('--random-plies', type=int, default=4, help='random moves at the start of every game')
+    parser.add_argument('--endgame', type=int, default=engine.ENDGAME_EMPTIES, help='empty spaces to solve the endgame exactly')
+    parser.add_argument('--probcut', type=float, default=engine.PROBCUT_THRESHOLD,
+                        help='ProbCut threshold in sigmas, lower prunes more (0 or less turns it off)')
+    parser.add_argument('--lmr', type=int, default=engine.LMR_REDUCTION, help='plies of late move reductions, 0 for none')
+    parser.add_argument('--seed', type=int, default=0, help='game i uses the seed SEED + i')
+    parser.add_argument('--output', default='selfplay.jsonl', help="JSONL file with one game per line, '-' for stdout")
+    parser.add_argument('--record', help='binary game archive to write the moves of the games to as well')
+    args = parser.parse_args(argv)
+
+    probcut = args.probcut if args.probcut is not None and args.probcut > 0 else None
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    archive = None
+    if args.record is not None:
+        archive = open(args.record, 'wb')
+        gamerecord.writeArchive(archive, [])
+    wins = {'black': 0, 'white': 0, 'draw': 0}
+    start = time.time()
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as executor:
+            # Only a few games are queued at a time and every record is written as soon as
+            # its game ends, so memory doesn't grow with the number of games.
+            pending = set()
+            next_game = 0
+            while next_game < args.games or pending:
+                while next_game < args.games and len(pending) < 2 * args.workers:
+                    pending.add(executor.submit(playGame, next_game, args.seed + next_game, args.depth, args.time_limit,
+                                                args.random_plies, args.endgame, probcut, args.lmr))
+                    next_game += 1
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    record = future.result()
+                    out.write(json.dumps(record) + '\n')
+                    out.flush()
+                    if archive is not None:
+                        gamerecord.appendArchive(archive, [record['moves']])
+                    wins[record['winner']] += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if archive is not None:
+            archive.close()
+
+    print('%d games in %.1f s: black %d, white %d, draws %d' % (
+        sum(wins.values()), time.time() - start, wins['black'], wins['white'], wins['draw']), file=sys.stderr)
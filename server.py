@@ -0,0 +1,227 @@
+# Analysis server of the Othello engine: a long-running asyncio server speaking
+# line-delimited JSON over TCP, so the engine (its transposition tables, opening book
+# and worker processes) stays warm between requests. It doesn't need pygame, run it with:
+#   python othello.py serve --port 8765 --workers 4
+# Every request is one line with a JSON object and gets one line back with the same "id":
+#   {"id": 1, "method": "valid_moves", "board": <64 chars of engine.boardToString>, "tile": "B"}
+#   {"id": 2, "method": "evaluate", "board": ..., "tile": "W"}
+#   {"id": 3, "method": "best_move", "board": ..., "tile": "B", "depth": 6, "time_limit": null}
+# (depth from 1 to MAX_DEPTH, time_limit null or up to MAX_TIME_LIMIT seconds). Every search
+# stops after MAX_TIME_LIMIT seconds at most: a search to "depth" with a null time_limit that
+# doesn't reach it in that time answers with the deepest depth it finished, in "depth".
+# Answers are {"id": ..., "result": ...} or {"id": ..., "error": "..."}. Requests of a
+# connection are answered as they finish, not in order.
+
+import argparse, asyncio, json, math, signal, sys
+import concurrent.futures
+from collections import OrderedDict
+
+import engine
+
+TILES = {'B': engine.BLACK_TILE, 'W': engine.WHITE_TILE}
+MAX_DEPTH = 16  # deepest best_move search a request can ask for
+MAX_TIME_LIMIT = 60  # longest time_limit of a best_move request, and of the ones without, in seconds
+
+
+def bestMove(text, tile, depth, time_limit):
+    # Worker side of best_move: getComputerMove keeps its transposition table between the
+    # calls of the same worker process.
+    board = engine.boardFromString(text)
+    info = {}
+    move = engine.getComputerMove(board, TILES[tile], time_limit, depth, info=info)
+    return {'move': None if move is None else list(move), 'score': info.get('score'), 'depth': info.get('depth'),
+            'outcome': info.get('outcome'), 'book': info.get('book', False), 'nodes': info.get('nodes', 0)}
+
+
+def evaluatePositions(positions):
+    # Worker side of evaluate: engine.evaluateBoard of each (board text, tile) of <positions>
+    # with <tile> to move, all of them in one NumPy call when batcheval can be imported.
+    boards = [(engine.boardFromString(text), TILES[tile]) for text, tile in positions]
+    try:
+        import batcheval
+    except ImportError:  # NumPy is not installed
+        return [engine.evaluateBoard(engine.boardToPosition(board, tile), tile) for board, tile in boards]
+    pairs = [engine.boardToBitboards(board, tile) for board, tile in boards]
+    return [int(value) for value in batcheval.evaluateBitboards([own for own, _ in pairs], [opp for _, opp in pairs])]
+
+
+class EvaluationBatcher:
+    # Collects the evaluate requests that arrive within <delay> seconds of each other (at
+    # most <size>) and sends them to the pool in one task, so a flood of small requests
+    # pays the round trip to a worker process once per batch instead of once per request.
+    def __init__(self, executor, size, delay):
+        self.executor = executor
+        self.size = size
+        self.delay = delay
+        self.pending = []
+        self.timer = None
+        self.batches = 0
+
+    def evaluate(self, text, tile):
+        # Returns a future with engine.evaluateBoard of the board, set when its batch is evaluated.
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((text, tile, future))
+        if len(self.pending) >= self.size:
+            self.flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.delay, self.flush)
+        return future
+
+    def flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending, []
+        if batch:
+            self.batches += 1
+            asyncio.ensure_future(self.run(batch))
+
+    async def run(self, batch):
+        loop = asyncio.get_running_loop()
+        try:
+            values = await loop.run_in_executor(self.executor, evaluatePositions,
+                                                [(text, tile) for text, tile, _ in batch])
+        except Exception as error:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+        else:
+            for (_, _, future), value in zip(batch, values):
+                if not future.done():
+                    future.set_result(value)
+
+
+class AnalysisServer:
+    # The state shared by all the connections: the worker processes, the batcher of the
+    # evaluations and a cache of best_move results without time limit (a search to a fixed
+    # depth doesn't depend on the time, so it's worth keeping), keyed by engine.canonicalHash
+    # so the symmetric versions of a position share their entry.
+    def __init__(self, workers, batch_size, batch_delay, cache_size):
+        self.workers = workers
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        self.batcher = EvaluationBatcher(self.executor, batch_size, batch_delay)
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.requests = 0
+
+    async def bestMove(self, text, tile, depth, time_limit):
+        loop = asyncio.get_running_loop()
+        if time_limit is not None:
+            return await loop.run_in_executor(self.executor, bestMove, text, tile, depth, time_limit)
+        board = engine.boardFromString(text)
+        key, symmetry = engine.canonicalHash(board, TILES[tile])
+        cached = self.cache.get((key, depth))
+        if cached is not None:
+            self.cache.move_to_end((key, depth))
+            result = dict(cached)
+            if result['move'] is not None:
+                result['move'] = engine.untransformMove(symmetry, *result['move'])
+            return result
+        # Without a time limit the search still gets one, so a deep request can't keep a worker
+        # busy for hours. Only the results that reached <depth> are kept, the others depend on time.
+        result = await loop.run_in_executor(self.executor, bestMove, text, tile, depth, MAX_TIME_LIMIT)
+        if result['depth'] is not None and result['depth'] >= depth:
+            cached = dict(result)
+            if cached['move'] is not None:
+                cached['move'] = engine.transformMove(symmetry, *cached['move'])
+            self.cache[(key, depth)] = cached
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return result
+
+    async def handle(self, request):
+        # Returns the result of one request, raises ValueError or KeyError if it is wrong.
+        method = request['method']
+        text = request['board']
+        tile = request['tile']
+        if tile not in TILES:
+            raise ValueError('tile must be B or W')
+        if method == 'valid_moves':  # Cheap enough to answer without leaving the event loop
+            return [list(move) for move in engine.getValidMoves(engine.boardFromString(text), TILES[tile])[0]]
+        elif method == 'evaluate':
+            engine.boardFromString(text)  # Bad boards fail here, not in the middle of a batch
+            return await self.batcher.evaluate(text, tile)
+        elif method == 'best_move':
+            # A search without a bound would keep a worker busy for good, so both are checked
+            depth = request.get('depth', engine.AI_MAX_DEPTH)
+            if isinstance(depth, bool) or not isinstance(depth, int) or not 1 <= depth <= MAX_DEPTH:
+                raise ValueError('depth must be an integer from 1 to %d' % MAX_DEPTH)
+            time_limit = request.get('time_limit')
+            if time_limit is not None and (isinstance(time_limit, bool) or not isinstance(time_limit, (int, float)) or
+                                           not math.isfinite(time_limit) or not 0 < time_limit <= MAX_TIME_LIMIT):
+                raise ValueError('time_limit must be null or a number of seconds up to %d' % MAX_TIME_LIMIT)
+            return await self.bestMove(text, tile, depth, time_limit)
+        raise ValueError('unknown method %r' % method)
+
+    async def answer(self, line, writer):
+        self.requests += 1
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            response = {'id': request_id, 'result': await self.handle(request)}
+        except (ValueError, KeyError, TypeError, AttributeError) as error:
+            response = {'id': request_id, 'error': '%s: %s' % (type(error).__name__, error)}
+        except Exception as error:  # The server's fault (like a worker process that died), still answered
+            response = {'id': request_id, 'error': 'server error, %s: %s' % (type(error).__name__, error)}
+        writer.write((json.dumps(response) + '\n').encode())
+        await writer.drain()
+
+    async def connection(self, reader, writer):
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    task = asyncio.ensure_future(self.answer(line, writer))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        loop = asyncio.get_running_loop()
+        # Start the worker processes (and their imports) before the first request
+        await asyncio.gather(*[loop.run_in_executor(self.executor, engine.opponent, engine.BLACK_TILE)
+                               for i in range(self.workers)])
+        server = await asyncio.start_server(self.connection, host, port)
+        print('serving on %s:%d' % (host, port), file=sys.stderr)
+        stop = asyncio.Event()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signal_number, stop.set)
+            except (NotImplementedError, RuntimeError):  # Windows, stop it with Ctrl+C
+                pass
+        async with server:
+            await stop.wait()
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='othello.py serve', description='Serve the engine over line-delimited JSON.')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on')
+    parser.add_argument('--port', type=int, default=8765, help='port to listen on')
+    parser.add_argument('--workers', type=int, default=2, help='number of processes running searches and evaluations')
+    parser.add_argument('--batch-size', type=int, default=256, help='most evaluate requests sent to a worker at once')
+    parser.add_argument('--batch-delay', type=float, default=0.002, help='seconds an evaluate request waits for others')
+    parser.add_argument('--cache-size', type=int, default=100000, help='best_move results kept')
+    args = parser.parse_args(argv)
+
+    server = AnalysisServer(args.workers, args.batch_size, args.batch_delay, args.cache_size)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.executor.shutdown()
+        print('%d requests, %d evaluation batches' % (server.requests, server.batcher.batches), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,132 @@
+# Training of the pattern evaluation of the engine (engine.PATTERN_SHAPES): every position of
+# some self-play games, seen by each side as the computer, is a row of a least squares
+# problem whose unknowns are the weights of a stage, and whose target is the final difference
+# of pieces of its game for that side. The weights of each stage are fitted with conjugate
+# gradients on the normal equations (ridge regularized, most table entries are seen in a few
+# positions or none) and written in the format of engine.PatternWeights. It needs NumPy.
+#   python othello.py selfplay --games 2000 --depth 2 --random-plies 8 --output selfplay.jsonl
+#   python othello.py train --games selfplay.jsonl --output patterns.bin
+
+import argparse, sys, time
+
+import numpy as np
+
+import batcheval
+import engine
+import gamerecord
+
+
+def gamePositions(path):
+    # Reads the games of <path> (any file of gamerecord.readGames) one at a time and yields
+    # (black, white, side to move, final black - white pieces) of each position played.
+    for moves in gamerecord.readGames(path):
+        positions = []
+        for position, move in gamerecord.replayGame(moves):
+            if move is not None:
+                positions.append((position.black, position.white, position.tile))
+        result = position.black_count - position.white_count
+        for black, white, tile in positions:
+            yield black, white, tile, result
+
+
+def trainingRows(path):
+    # Arrays of the rows of the least squares problems: the stage, the columns of the weights
+    # used (the indices of engine.patternIndices, the mobility and the side to move) and the
+    # target, for every position of the games in <path> and each side.
+    black, white, black_to_move, result = [], [], [], []
+    for black_bits, white_bits, tile, black_result in gamePositions(path):
+        black.append(black_bits)
+        white.append(white_bits)
+        black_to_move.append(tile == engine.BLACK_TILE)
+        result.append(black_result)
+    black = np.array(black, dtype=np.uint64)
+    white = np.array(white, dtype=np.uint64)
+    black_to_move = np.array(black_to_move)
+    result = np.array(result, dtype=np.float64)
+    # Every position twice, first with black as the computer and then with white
+    own = np.concatenate((black, white))
+    opp = np.concatenate((white, black))
+    computer_to_move = np.concatenate((black_to_move, ~black_to_move))
+    target = np.concatenate((result, -result))
+
+    own_spaces = batcheval.unpackBits(own)
+    opp_spaces = batcheval.unpackBits(opp)
+    empties = 64 - own_spaces.sum(axis=1, dtype=np.int32) - opp_spaces.sum(axis=1, dtype=np.int32)
+    stage = np.minimum((60 - empties) // engine.PATTERN_STAGE_EMPTIES, engine.PATTERN_STAGES - 1)
+    n_moves = np.minimum(batcheval.popcount(batcheval.validMoves(np.concatenate((own, opp)), np.concatenate((opp, own)))),
+                         engine.MOBILITY_MOVES - 1)
+    mobility = engine.MOBILITY_OFFSET + n_moves[:len(own)] * engine.MOBILITY_MOVES + n_moves[len(own):]
+    turn = engine.TURN_OFFSET + np.where(computer_to_move, 0, 1)
+    columns = np.concatenate((batcheval.patternIndices(own_spaces, opp_spaces), mobility[:, None], turn[:, None]), axis=1)
+    return stage, columns, target
+
+
+def fitStage(columns, target, ridge, iterations):
+    # Weights w minimizing |A w - target|^2 + ridge * |w|^2, where row i of A has a 1 in each
+    # of columns[i]. A is never built: A w is a sum of weights per row and A^T r a bincount.
+    n_columns = columns.shape[1]
+
+    def normal(w):  # (A^T A + ridge I) w
+        return np.bincount(columns.ravel(), weights=np.repeat(w[columns].sum(axis=1), n_columns),
+                           minlength=engine.STAGE_WEIGHTS) + ridge * w
+
+    b = np.bincount(columns.ravel(), weights=np.repeat(target, n_columns), minlength=engine.STAGE_WEIGHTS)
+    w = np.zeros(engine.STAGE_WEIGHTS)
+    r = b.copy()
+    p = r.copy()
+    rr = r @ r
+    for i in range(iterations):
+        q = normal(p)
+        alpha = rr / (p @ q)
+        w += alpha * p
+        r -= alpha * q
+        rr_next = r @ r
+        if rr_next <= 1e-12 * (b @ b):
+            break
+        p = r + (rr_next / rr) * p
+        rr = rr_next
+    return w
+
+
+def rmse(columns, target, w):
+    return float(np.sqrt(np.mean((w[columns].sum(axis=1) - target) ** 2))) if len(target) else 0.0
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='othello.py train', description='Fit the weights of the pattern evaluation.')
+    parser.add_argument('--games', required=True, help='games of othello.py selfplay (JSONL) or any gamerecord.py file')
+    parser.add_argument('--output', default=engine.PATTERN_FILE, help='weights file to write')
+    parser.add_argument('--ridge', type=float, default=100.0, help='regularization, higher keeps the weights smaller')
+    parser.add_argument('--iterations', type=int, default=200, help='most conjugate gradient iterations per stage')
+    parser.add_argument('--validation', type=float, default=0.1, help='fraction of the games left out to test the fit')
+    args = parser.parse_args(argv)
+
+    start = time.time()
+    stage, columns, target = trainingRows(args.games)
+    # The rows come game after game, so the last ones are whole games the fit doesn't see
+    n_positions = len(target) // 2
+    split = int(n_positions * (1 - args.validation))
+    training = np.zeros(len(target), dtype=bool)
+    training[:split] = True
+    training[n_positions:n_positions + split] = True
+    print('%d positions read in %.1f s' % (n_positions, time.time() - start), file=sys.stderr)
+
+    weights = np.zeros((engine.PATTERN_STAGES, engine.STAGE_WEIGHTS), dtype='<i2')
+    for s in range(engine.PATTERN_STAGES):
+        fit_rows = training & (stage == s)
+        test_rows = ~training & (stage == s)
+        w = fitStage(columns[fit_rows], target[fit_rows], args.ridge, args.iterations)
+        print('stage %d: %6d rows, error %.2f pieces, %.2f on the games left out (%d rows)' % (
+            s, fit_rows.sum(), rmse(columns[fit_rows], target[fit_rows], w),
+            rmse(columns[test_rows], target[test_rows], w), test_rows.sum()), file=sys.stderr)
+        weights[s] = np.clip(np.round(w * engine.PATTERN_SCALE), -32768, 32767)
+
+    with open(args.output, 'wb') as out:
+        out.write(engine.PatternWeights.HEADER.pack(engine.PatternWeights.MAGIC, engine.PATTERN_STAGES,
+                                                    engine.STAGE_WEIGHTS))
+        weights.tofile(out)
+    print('weights written to %s in %.1f s' % (args.output, time.time() - start), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])